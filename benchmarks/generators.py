@@ -0,0 +1,70 @@
+"""Candidates per second of the strategy generators
+
+Run from the repository root with `python -m benchmarks.generators`.
+"""
+from argparse import ArgumentParser
+from time import perf_counter
+
+from simple_algs.control_structures import ConditionalStatement, WhileLoop
+from simple_algs.memory import Calculator, Tape
+from simple_algs.strategy_generators import (
+    BruteForceGenerator,
+    GrammarGenerator
+)
+
+
+def instruction_sets():
+    calculator = Calculator()
+    tape = Tape(3, (4, 4))
+    return {
+        'calculator': (calculator.actions, [], []),
+        'tape': (
+            tape.actions,
+            [ConditionalStatement, WhileLoop],
+            tape.conditions
+        )
+    }
+
+
+def measure(generator_class, instructions, max_length):
+    generator = generator_class(*instructions, max_length)
+    started = perf_counter()
+    candidates = 0
+    for _ in generator.generate():
+        candidates += 1
+    elapsed = perf_counter() - started
+    return candidates, elapsed
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--max-length', type=int, default=4)
+    arguments = parser.parse_args()
+
+    for name, instructions in instruction_sets().items():
+        results = {}
+        for generator_class in (BruteForceGenerator, GrammarGenerator):
+            candidates, elapsed = measure(
+                generator_class,
+                instructions,
+                arguments.max_length
+            )
+            results[generator_class.__name__] = (candidates, elapsed)
+            print(
+                "{:<12}{:<22}{:>10} candidates {:>8.2f}s {:>12.0f}/s".format(
+                    name,
+                    generator_class.__name__,
+                    candidates,
+                    elapsed,
+                    candidates / elapsed
+                )
+            )
+        speedup = (
+            results['BruteForceGenerator'][1] /
+            results['GrammarGenerator'][1]
+        )
+        print("{:<12}speedup {:.2f}x".format(name, speedup))
+
+
+if __name__ == '__main__':
+    main()
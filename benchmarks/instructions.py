@@ -0,0 +1,62 @@
+"""Instruction executions per second
+
+Compares resolving the calling convention with `inspect.signature` on every
+execution (how `Instruction.execute` used to work) with the convention that
+is resolved once when the instruction is built.
+Run from the repository root with `python -m benchmarks.instructions`.
+"""
+from argparse import ArgumentParser
+from functools import partial
+from inspect import signature
+from time import perf_counter
+
+from simple_algs.instructions import Action
+from simple_algs.memory import Calculator, Tape
+from simple_algs.strategy import OperationsCounter
+
+
+def execute_with_signature(instruction, operations_counter):
+    if 'operations_counter' in signature(instruction.execution).parameters:
+        return instruction.execution(operations_counter)
+    operations_counter.increment()
+    return instruction.execution()
+
+
+def execute_resolved(instruction, operations_counter):
+    return instruction.execute(operations_counter)
+
+
+def measure(execute, instruction, executions):
+    operations_counter = OperationsCounter()
+    started = perf_counter()
+    for _ in range(executions):
+        execute(instruction, operations_counter)
+    return executions / (perf_counter() - started)
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--executions', type=int, default=200000)
+    arguments = parser.parse_args()
+
+    calculator = Calculator()
+    tape = Tape(9, (3, 3))
+    instructions = {
+        'bound method': Action(calculator.add),
+        'partial': Action(partial(tape.increment_pointer, axis=0)),
+    }
+    for name, instruction in instructions.items():
+        before = measure(
+            execute_with_signature,
+            instruction,
+            arguments.executions
+        )
+        after = measure(execute_resolved, instruction, arguments.executions)
+        print(
+            "{:<14}signature per call {:>10.0f}/s   resolved {:>10.0f}/s"
+            "   speedup {:.1f}x".format(name, before, after, after / before)
+        )
+
+
+if __name__ == '__main__':
+    main()
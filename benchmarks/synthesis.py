@@ -0,0 +1,336 @@
+"""Throughput and time to solution of `SupervisedLearning.fit`
+
+Every task is fit with each maximum length (`--repeats` times and at least
+for `--min-time` seconds, the fastest fit counts). Tasks whose names end
+with '_exhaustive' never accept a strategy, so they score every candidate
+of each length. Reported are scored candidates per second, operations
+(executed instructions) per second, seconds to an accepted strategy (none
+if the length is too short for one) and the peak memory, which is measured
+with `tracemalloc` in a separate fit because it slows execution down.
+`--save` writes the results as JSON and `--compare` exits with an error if
+a rate dropped (or the time or the peak memory grew) by more than
+`--threshold` compared to saved results.
+Run from the repository root with `python -m benchmarks.synthesis`.
+"""
+from argparse import ArgumentParser
+from copy import deepcopy
+from functools import partial
+from json import load
+from os.path import dirname, join
+from tracemalloc import get_traced_memory, start, stop
+
+from numpy import array, zeros_like
+
+from simple_algs.helpers import read_json, write_json
+from simple_algs.instructions import ControlStructure
+from simple_algs.memory import Calculator, Ignored, MemoryCollection, Tape
+from simple_algs.supervised_learning import DataSample, SupervisedLearning
+
+GRID_TASK_PATH = join(dirname(__file__), '..', 'tests', 'data', 'test.json')
+
+
+def calculator_task(max_length, accepted_score=1):
+    """2x + 1"""
+    data = [DataSample(2, 5), DataSample(3, 7), DataSample(5, 11)]
+    supervised_learning = SupervisedLearning(
+        Calculator(),
+        brute_force_generator_max_length=max_length,
+        accepted_score=accepted_score
+    )
+    return supervised_learning, data
+
+
+def grid_task(max_length, accepted_score=1):
+    """Recoloring of a grid (swapping rows) from `tests/data/test.json`"""
+    with open(GRID_TASK_PATH) as file:
+        data = DataSample.from_list_of_dicts(load(file)['train'])
+    for sample in data:
+        sample.input = {
+            'input': sample.input,
+            'output_shape': (len(sample.output), len(sample.output[0]))
+        }
+
+    input_tape = Tape(9, (0,))
+    output_tape = Tape(9, (0,))
+    memory = MemoryCollection(
+        {
+            'input': input_tape,
+            'output_shape': Ignored(),
+            'output': output_tape
+        },
+        output_element='output'
+    )
+
+    def move_left():
+        input_tape.decrement_pointer(1)
+        output_tape.decrement_pointer(1)
+
+    def move_right():
+        input_tape.increment_pointer(1)
+        output_tape.increment_pointer(1)
+
+    def move_up():
+        input_tape.decrement_pointer(0)
+        output_tape.decrement_pointer(0)
+
+    def move_down():
+        input_tape.increment_pointer(0)
+        output_tape.increment_pointer(0)
+
+    def suck_color():
+        output_tape.select_value(input_tape.get())
+
+    def paint():
+        output_tape.set_selected()
+
+    class ForEachCell(ControlStructure):
+        KEYWORD = 'FOR_EACH_CELL'
+
+        def execute(self, operations_counter):
+            for i in range(input_tape.shape[0]):
+                for j in range(input_tape.shape[1]):
+                    input_tape.pointer = [i, j]
+                    output_tape.pointer = [i, j]
+                    self.body(operations_counter)
+                    if not operations_counter.allow_execution():
+                        return
+
+    memory.actions = [
+        move_left, move_right, move_up, move_down, suck_color, paint
+    ]
+    memory.control_structures = [ForEachCell]
+    memory.conditions = []
+
+    def preprocess_input(input_):
+        input_ = dict(input_)
+        input_['input'] = array(input_['input'])
+        return input_
+
+    def prepare_output_tape(args):
+        elements = args['supervised_learning'].memory.elements
+        output_tape.shape = elements['output_shape'].data
+        output_tape.data = deepcopy(elements['input'].data)
+
+    supervised_learning = SupervisedLearning(
+        memory,
+        preprocess_input=preprocess_input,
+        preprocess_output=array,
+        brute_force_generator_max_length=max_length,
+        accepted_score=accepted_score
+    )
+    supervised_learning.add_event_listener(
+        'pre_strategy_execution',
+        prepare_output_tape
+    )
+    return supervised_learning, data
+
+
+def string_task(max_length, accepted_score=1):
+    """Reversal of a string (of character codes on tapes)"""
+    data = DataSample.from_list_of_dicts([
+        {'input': 'abc', 'output': 'cba'},
+        {'input': 'hello', 'output': 'olleh'},
+        {'input': 'simple', 'output': 'elpmis'}
+    ])
+    input_tape = Tape(0, (0,))
+    output_tape = Tape(0, (0,))
+    memory = MemoryCollection(
+        {'input': input_tape, 'output': output_tape},
+        input_element='input',
+        output_element='output'
+    )
+
+    def move_input_left():
+        input_tape.decrement_pointer(0)
+
+    def move_input_right():
+        input_tape.increment_pointer(0)
+
+    def move_output_left():
+        output_tape.decrement_pointer(0)
+
+    def move_output_right():
+        output_tape.increment_pointer(0)
+
+    def copy():
+        output_tape.set(input_tape.get())
+
+    class ForEachCharacter(ControlStructure):
+        KEYWORD = 'FOR_EACH_CHARACTER'
+
+        def execute(self, operations_counter):
+            for _ in range(input_tape.shape[0]):
+                self.body(operations_counter)
+                if not operations_counter.allow_execution():
+                    return
+
+    memory.actions = [
+        move_input_left,
+        move_input_right,
+        move_output_left,
+        move_output_right,
+        copy
+    ]
+    memory.control_structures = [ForEachCharacter]
+    memory.conditions = []
+
+    def codes(string):
+        return array([ord(character) for character in string])
+
+    def prepare_output_tape(args):
+        output_tape.data = zeros_like(input_tape.data)
+        output_tape.shape = input_tape.shape
+        input_tape.pointer = [0]
+        output_tape.pointer = [0]
+
+    supervised_learning = SupervisedLearning(
+        memory,
+        preprocess_input=codes,
+        preprocess_output=codes,
+        brute_force_generator_max_length=max_length,
+        accepted_score=accepted_score
+    )
+    supervised_learning.add_event_listener(
+        'pre_strategy_execution',
+        prepare_output_tape
+    )
+    return supervised_learning, data
+
+
+# The calculator has too many instructions to be searched exhaustively
+TASKS = {
+    'calculator': calculator_task,
+    'grid': grid_task,
+    'grid_exhaustive': partial(grid_task, accepted_score=2),
+    'string': string_task,
+    'string_exhaustive': partial(string_task, accepted_score=2)
+}
+
+# Metrics and whether higher values are better
+METRICS = {
+    'candidates_per_second': True,
+    'operations_per_second': True,
+    'time_to_solution': False,
+    'peak_memory': False
+}
+
+
+def measure(task, max_length, repeats=3, min_time=1.0):
+    fits = []
+    # Short fits are repeated more, so that noise doesn't look like a
+    # regression
+    while len(fits) < repeats or sum(fit[0] for fit in fits) < min_time:
+        supervised_learning, data = task(max_length)
+        stats = supervised_learning.fit(data)
+        fits.append((stats.elapsed, stats))
+    elapsed, stats = min(fits, key=lambda fit: fit[0])
+    elapsed = max(elapsed, 1e-9)
+
+    supervised_learning, data = task(max_length)
+    start()
+    try:
+        supervised_learning.fit(data)
+        peak_memory = get_traced_memory()[1]
+    finally:
+        stop()
+
+    return {
+        'candidates': stats.candidates,
+        'candidates_per_second': stats.candidates / elapsed,
+        'operations_per_second': stats.operations / elapsed,
+        'time_to_solution': (
+            stats.elapsed if stats.stop_reason == 'accepted' else None
+        ),
+        'peak_memory': peak_memory
+    }
+
+
+def regressions(results, baseline, threshold):
+    """Descriptions of the metrics that got worse by more than threshold"""
+    found = []
+    for name, lengths in results.items():
+        for max_length, metrics in lengths.items():
+            try:
+                baseline_metrics = baseline[name][max_length]
+            except KeyError:
+                continue
+            for metric, higher_is_better in METRICS.items():
+                value = metrics.get(metric)
+                baseline_value = baseline_metrics.get(metric)
+                if value is None or not baseline_value:
+                    continue
+                change = value / baseline_value - 1
+                if (change < -threshold if higher_is_better
+                        else change > threshold):
+                    found.append(
+                        "{} max_length={} {}: {:.4g} -> {:.4g} "
+                        "({:+.0%})".format(
+                            name,
+                            max_length,
+                            metric,
+                            baseline_value,
+                            value,
+                            change
+                        )
+                    )
+    return found
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tasks', nargs='+', choices=sorted(TASKS),
+                        default=sorted(TASKS))
+    parser.add_argument('--min-length', type=int, default=3)
+    parser.add_argument('--max-length', type=int, default=6)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--min-time', type=float, default=1.0)
+    parser.add_argument('--save', help="path of a JSON file for results")
+    parser.add_argument('--compare', help="path of saved results")
+    parser.add_argument('--threshold', type=float, default=0.2)
+    arguments = parser.parse_args()
+
+    results = {}
+    for name in arguments.tasks:
+        results[name] = {}
+        for max_length in range(
+                arguments.min_length,
+                arguments.max_length + 1
+        ):
+            metrics = measure(
+                TASKS[name],
+                max_length,
+                arguments.repeats,
+                arguments.min_time
+            )
+            # JSON objects have string keys
+            results[name][str(max_length)] = metrics
+            time_to_solution = metrics['time_to_solution']
+            print(
+                "{:<20}max_length={:<3}{:>10} candidates {:>10.0f}/s "
+                "{:>12.0f} ops/s   solution {:>8}   peak {:>8.1f} KiB".format(
+                    name,
+                    max_length,
+                    metrics['candidates'],
+                    metrics['candidates_per_second'],
+                    metrics['operations_per_second'],
+                    "-" if time_to_solution is None
+                    else "{:.2f}s".format(time_to_solution),
+                    metrics['peak_memory'] / 1024
+                )
+            )
+
+    if arguments.save:
+        write_json(arguments.save, results)
+    if arguments.compare:
+        baseline = read_json(arguments.compare)
+        if baseline is None:
+            parser.error("can't read " + arguments.compare)
+        found = regressions(results, baseline, arguments.threshold)
+        for description in found:
+            print("regression: " + description)
+        if found:
+            parser.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,16 @@
 from .supervised_learning import SupervisedLearning, DataSample
 from .memory import MemoryCollection, Tape, Calculator, MemoryAbstract
 from .strategy import Strategy, OperationsCounter
+from .compact_strategy import CompactStrategy
 from .instructions import Action, Condition, ControlStructure
-from .strategy_generators import BruteForceGenerator
+from .strategy_generators import (
+    BestFirstGenerator,
+    BruteForceGenerator,
+    GrammarGenerator
+)
 from .control_structures import ConditionalStatement, WhileLoop
+from .cache import ResultCache, ResultFile
+from .automation import function_from_examples
+from .search_stats import SearchStats
+from .rules import RuleSet
+from .profiler import Profiler
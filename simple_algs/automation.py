@@ -0,0 +1,34 @@
+from .cache import ResultFile
+from .memory import Calculator
+from .supervised_learning import DataSample, SupervisedLearning
+
+
+def function_from_examples(examples, file_path=None, memory=None, cache=None,
+                           **kwargs):
+    """Find a function that fits the examples
+
+    # Arguments
+        examples: List of dictionaries with 'input' and 'output' keys.
+        file_path: Path of a file to save the found function to. If the file
+            already holds the function found for the same examples and
+            settings, it's read instead of searching again. The function is
+            saved as a small JSON record (its index in the enumeration of
+            strategies), not as a pickle.
+        memory: Memory to search with, `Calculator` by default (so it finds
+            arithmetic functions).
+        cache: `ResultCache` to use instead of `file_path`, e.g. one shared
+            by many jobs.
+        **kwargs: Passed to `SupervisedLearning`.
+
+    # Returns
+        The function, which returns None if nothing fit the examples.
+    """
+    if cache is None and file_path is not None:
+        cache = ResultFile(file_path)
+    supervised_learning = SupervisedLearning(
+        memory or Calculator(),
+        cache=cache,
+        **kwargs
+    )
+    supervised_learning.fit(DataSample.from_list_of_dicts(examples))
+    return supervised_learning.predict
@@ -0,0 +1,202 @@
+from functools import partial
+from glob import glob
+from hashlib import sha256
+from os import makedirs, remove, utime
+from os.path import getmtime, join
+from types import BuiltinFunctionType, CodeType, FunctionType, MethodType
+
+from numpy import ascontiguousarray, ndarray
+
+from .helpers import read_json, write_json
+from .instructions import ControlStructure, Instruction
+from .memory import MemoryAbstract
+
+
+class ResultCache:
+    """Content-addressed directory of fit results
+
+    Every entry is a small JSON file named after the key, which is a hash of
+    the examples, the instruction set and the search parameters (see
+    `cache_key`). Entries are evicted least recently used first when there
+    are more than `max_entries` of them.
+    """
+
+    def __init__(self, directory, max_entries=1000):
+        self.directory = directory
+        self.max_entries = max_entries
+        makedirs(directory, exist_ok=True)
+
+    def lookup(self, key):
+        path = self._path(key)
+        record = read_json(path)
+        if record is not None:
+            _touch(path)
+        return record
+
+    def store(self, key, record):
+        write_json(self._path(key), record)
+        self._evict()
+
+    def invalidate(self, key=None):
+        """Remove the entry of the key or all entries if it's not given"""
+        paths = [self._path(key)] if key is not None else self._paths()
+        for path in paths:
+            _remove(path)
+
+    def _evict(self):
+        paths = sorted(self._paths(), key=_modification_time)
+        for path in paths[:max(0, len(paths) - self.max_entries)]:
+            _remove(path)
+
+    def _paths(self):
+        return glob(join(self.directory, '*.json'))
+
+    def _path(self, key):
+        return join(self.directory, key + '.json')
+
+
+class ResultFile:
+    """Single fit result saved to a file, valid only for the key it has"""
+
+    def __init__(self, path):
+        self.path = path
+
+    def lookup(self, key):
+        entry = read_json(self.path)
+        if entry is None or entry.get('key') != key:
+            return None
+        return entry['record']
+
+    def store(self, key, record):
+        write_json(self.path, {'key': key, 'record': record})
+
+    def invalidate(self, key=None):
+        _remove(self.path)
+
+
+def cache_key(supervised_learning, data):
+    """Hash of everything that determines the result of a fit
+
+    None if some of it (e.g. an object that an action refers to) can't be
+    hashed stably, then the result of the fit mustn't be reused.
+    """
+    try:
+        return content_hash(
+            [(sample.input, sample.output) for sample in data],
+            supervised_learning.strategy_generator.parameters(),
+            supervised_learning.accepted_score,
+            supervised_learning.operations_counter.limit,
+            supervised_learning.comparator
+        )
+    except ValueError:
+        return None
+
+
+def content_hash(*values):
+    """Hash that is stable between runs (unlike `hash` of most objects)
+
+    Raises ValueError for values that can't be described stably (objects
+    whose representation is their address).
+    """
+    digest = sha256()
+    for value in values:
+        _update(digest, value, ())
+    return digest.hexdigest()
+
+
+def _update(digest, value, functions):
+    # functions are the ones being hashed, so recursive ones end
+    def write(*parts):
+        for part in parts:
+            digest.update(str(part).encode() + b'\0')
+
+    if isinstance(value, ndarray):
+        write('ndarray', value.dtype, value.shape)
+        digest.update(ascontiguousarray(value).tobytes())
+    elif isinstance(value, partial):
+        write('partial')
+        _update(digest, value.func, functions)
+        _update(digest, value.args, functions)
+        _update(digest, value.keywords, functions)
+    elif isinstance(value, MethodType):
+        write('method', _qualified_name(value.__self__.__class__))
+        write(value.__func__.__name__)
+    elif isinstance(value, FunctionType):
+        write('function', _qualified_name(value))
+        if value in functions:
+            return
+        functions += (value,)
+        _update(digest, value.__code__, functions)
+        _update(digest, value.__defaults__, functions)
+        _update(digest, value.__kwdefaults__, functions)
+        cells = value.__closure__ or ()
+        _update(
+            digest,
+            [cell.cell_contents for cell in cells],
+            functions
+        )
+    elif isinstance(value, CodeType):
+        write('code', value.co_names)
+        digest.update(value.co_code)
+        _update(digest, value.co_consts, functions)
+    elif isinstance(value, (BuiltinFunctionType, type)):
+        write('callable', _qualified_name(value))
+    elif isinstance(value, MemoryAbstract):
+        # Like methods of memories, which are hashed without their state
+        write('memory', _qualified_name(value.__class__))
+    elif isinstance(value, ControlStructure):
+        write('control_structure', _qualified_name(value.__class__))
+        _update(digest, value.condition, functions)
+        _update(digest, value.body.instructions, functions)
+    elif isinstance(value, Instruction):
+        write('instruction', _qualified_name(value.__class__))
+        _update(digest, value.execution, functions)
+    elif isinstance(value, dict):
+        write('dict', len(value))
+        for key in sorted(value, key=repr):
+            _update(digest, key, functions)
+            _update(digest, value[key], functions)
+    elif isinstance(value, (list, tuple)):
+        write(value.__class__.__name__, len(value))
+        for item in value:
+            _update(digest, item, functions)
+    elif isinstance(value, (set, frozenset)):
+        # Constants of code (e.g. of `x in {1, 2}`) can be frozensets
+        write(value.__class__.__name__, len(value))
+        for item in sorted(value, key=repr):
+            _update(digest, item, functions)
+    elif value.__class__.__repr__ is object.__repr__:
+        raise ValueError(
+            "Objects of " + _qualified_name(value.__class__) +
+            " can't be hashed stably"
+        )
+    else:
+        write(value.__class__.__name__, repr(value))
+
+
+def _qualified_name(value):
+    return "{}.{}".format(
+        getattr(value, '__module__', ''),
+        getattr(value, '__qualname__', repr(value))
+    )
+
+
+def _remove(path):
+    try:
+        remove(path)
+    except OSError:
+        pass
+
+
+def _touch(path):
+    try:
+        utime(path)
+    except OSError:
+        pass
+
+
+def _modification_time(path):
+    try:
+        return getmtime(path)
+    except OSError:
+        return 0
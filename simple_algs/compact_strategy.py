@@ -0,0 +1,111 @@
+from copy import copy
+
+from .helpers import same
+from .instructions import ControlStructure
+from .strategy import Strategy
+
+
+class CompactStrategy:
+    """Strategy encoded as opcodes, which index a table of instructions
+
+    Opcode `END_OF_BODY` ends the innermost open body and bodies that are
+    still open at the end are closed implicitly (the opcodes are digits of
+    `BruteForceGenerator`, whose instructions are the table). The table is
+    shared by all strategies of a generator, so a compact strategy is only a
+    tuple of integers, which is hashable and cheap to keep.
+
+    It's materialized into a `Strategy` (with copies of control structures)
+    when its instructions are needed, at most once. Strategies of actions
+    only are executed without that.
+    """
+    __slots__ = ('opcodes', 'table', '_strategy', '_actions')
+
+    END_OF_BODY = 0
+
+    def __init__(self, opcodes, table):
+        self.opcodes = tuple(opcodes)
+        self.table = table
+        self._strategy = None
+        # Actions of the opcodes (resolved when it's executed for the first
+        # time) or False if there are control structures
+        self._actions = None
+
+    @property
+    def instructions(self):
+        return self.materialize().instructions
+
+    def materialize(self):
+        if self._strategy is None:
+            self._strategy = build_strategy(self.opcodes, self.table)
+        return self._strategy
+
+    def execute(self, operations_counter):
+        actions = self._actions
+        if actions is None:
+            actions = self._actions = self._resolve_actions()
+        if actions is False:
+            self.materialize().execute(operations_counter)
+            return
+        for action in actions:
+            action(operations_counter)
+
+    def _resolve_actions(self):
+        table = self.table
+        actions = []
+        for opcode in self.opcodes:
+            instruction = table[opcode]
+            # An end of a body is valid only after a control structure
+            if isinstance(instruction, ControlStructure):
+                return False
+            actions.append(instruction)
+        return tuple(actions)
+
+    def compile(self):
+        return self.materialize().compile()
+
+    def canonical_key(self):
+        return self.materialize().canonical_key()
+
+    def same(self, other):
+        return self == other
+
+    def __call__(self, operations_counter=None):
+        self.execute(operations_counter)
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactStrategy):
+            return False
+        return self.opcodes == other.opcodes and (
+            self.table is other.table or same(self.table, other.table)
+        )
+
+    def __hash__(self):
+        return hash(self.opcodes)
+
+    def __str__(self):
+        return str(self.materialize())
+
+    def __repr__(self):
+        return 'CompactStrategy(' + repr(self.opcodes) + ')'
+
+
+def build_strategy(opcodes, table):
+    """Strategy of the opcodes or False if a body is ended but not opened"""
+    strategy = Strategy()
+    body_stack = [strategy]
+    for opcode in opcodes:
+        instruction = table[opcode]
+        if opcode == CompactStrategy.END_OF_BODY:
+            body_stack.pop()
+            if not body_stack:
+                return False
+            continue
+        if isinstance(instruction, ControlStructure):
+            # Only control structures carry per-strategy state (the body)
+            instruction = copy(instruction)
+            instruction.body = Strategy()
+            body_stack[-1].append(instruction)
+            body_stack.append(instruction.body)
+        else:
+            body_stack[-1].append(instruction)
+    return strategy
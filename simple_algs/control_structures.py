@@ -2,8 +2,11 @@ from .instructions import ControlStructure
 
 
 class ConditionalStatement(ControlStructure):
+    __slots__ = ()
+
     NEEDS_CONDITION = True
     KEYWORD = 'IF'
+    EMPTY_BODY_DOES_NOTHING = True
 
     def execute(self, operations_counter):
         if (
@@ -12,8 +15,17 @@ class ConditionalStatement(ControlStructure):
         ):
             self.body(operations_counter)
 
+    def compile(self, compiler):
+        condition = compiler.condition(self.condition)
+        compiler.emit("if " + condition + " and allow_execution():")
+        compiler.indent()
+        compiler.compile_strategy(self.body)
+        compiler.dedent()
+
 
 class WhileLoop(ControlStructure):
+    __slots__ = ()
+
     NEEDS_CONDITION = True
     KEYWORD = 'WHILE'
 
@@ -23,3 +35,57 @@ class WhileLoop(ControlStructure):
                 operations_counter.allow_execution()
         ):
             self.body(operations_counter)
+
+    def compile(self, compiler):
+        compiler.emit("while True:")
+        compiler.indent()
+        condition = compiler.condition(self.condition)
+        compiler.emit("if not (" + condition + " and allow_execution()):")
+        compiler.indent()
+        compiler.emit("break")
+        compiler.dedent()
+        compiler.compile_strategy(self.body)
+        compiler.dedent()
+
+
+class BatchConditionalStatement(ConditionalStatement):
+    """`ConditionalStatement` for batched memories (e.g. `BatchTape`)
+
+    The condition returns a mask of lanes and the body is executed only for
+    the lanes where it holds.
+    """
+    __slots__ = ()
+
+    def execute(self, operations_counter):
+        outer = operations_counter.active
+        mask = self.condition(operations_counter)
+        lanes = operations_counter.allowed_lanes() & mask
+        if not lanes.any():
+            return
+        operations_counter.active = lanes
+        try:
+            self.body(operations_counter)
+        finally:
+            operations_counter.active = outer
+
+    compile = ControlStructure.compile
+
+
+class BatchWhileLoop(WhileLoop):
+    """`WhileLoop` for batched memories, every lane leaves it on its own"""
+    __slots__ = ()
+
+    def execute(self, operations_counter):
+        outer = operations_counter.active
+        try:
+            while True:
+                mask = self.condition(operations_counter)
+                lanes = operations_counter.allowed_lanes() & mask
+                if not lanes.any():
+                    return
+                operations_counter.active = lanes
+                self.body(operations_counter)
+        finally:
+            operations_counter.active = outer
+
+    compile = ControlStructure.compile
@@ -1,7 +1,9 @@
 from functools import partial
+from json import dumps, load
+from os import getpid, replace
 from types import FunctionType, MethodType
 
-from numpy import array_equal, ndarray
+from numpy import array_equal, asarray, ndarray
 
 
 class CustomBaseNumber:
@@ -31,6 +33,20 @@ class CustomBaseNumber:
             else:
                 self.digits.append(1)
 
+    @staticmethod
+    def from_digits(digits, base):
+        number = CustomBaseNumber(0, base)
+        number.digits = list(digits)
+        while number.digits and not number.digits[-1]:
+            number.digits.pop()
+        return number
+
+    def to_decimal(self):
+        decimal = 0
+        for digit in reversed(self.digits):
+            decimal = decimal * self.base + digit
+        return decimal
+
     def __eq__(self, other):
         return (
                 isinstance(other, CustomBaseNumber) and
@@ -42,6 +58,13 @@ class CustomBaseNumber:
 
 
 class EventDispatcher:
+    """Object whose events call the listeners added to them
+
+    Listeners are looked up in `event_listeners` (which can also be changed
+    directly) on every dispatch, so dispatching an event without listeners
+    costs a dictionary lookup.
+    """
+
     def __init__(self, event_listeners=None):
         self.event_listeners = event_listeners or {}
 
@@ -50,11 +73,19 @@ class EventDispatcher:
             self.event_listeners[event] = []
         self.event_listeners[event].append(listener)
 
+    def has_listeners(self, event):
+        return bool(self.event_listeners.get(event))
+
+    def listeners(self, event):
+        return tuple(self.event_listeners.get(event, ()))
+
     def dispatch_event(self, event, args):
-        if event not in self.event_listeners:
+        listeners = self.event_listeners.get(event)
+        if not listeners:
             return
 
-        for listener in self.event_listeners[event]:
+        # Listeners added by listeners are called from the next dispatch
+        for listener in tuple(listeners):
             listener(args)
 
 
@@ -103,3 +134,134 @@ def same(a, b):
         return True
 
     return a == b
+
+
+def execution_key(execution):
+    """Hashable key of an execution
+
+    Partials of the same function and arguments have equal keys, but
+    (unlike with `same`) methods of different objects don't.
+    """
+    if isinstance(execution, partial):
+        return (
+            partial,
+            execution_key(execution.func),
+            tuple(_hashable(argument) for argument in execution.args),
+            tuple(sorted(
+                (name, _hashable(argument))
+                for name, argument in execution.keywords.items()
+            ))
+        )
+    return _hashable(execution)
+
+
+def _hashable(value):
+    try:
+        hash(value)
+    except TypeError:
+        return 'id', id(value)
+    return value
+
+
+# Factories of comparators by the class of the expected value
+_comparator_factories = {}
+
+
+def register_comparator(class_, factory):
+    """Compare values with instances of the class faster than with `same`
+
+    `factory(expected)` returns a function of `(value, expected)` that
+    returns the same as `same(value, expected)` for that expected value.
+    Instances of subclasses are still compared with `same`.
+    """
+    _comparator_factories[class_] = factory
+
+
+def comparator_for(expected):
+    """Fastest function of `(value, expected)` equivalent to `same`"""
+    factory = _comparator_factories.get(expected.__class__)
+    return same if factory is None else factory(expected)
+
+
+def _same_values(a, b):
+    return a.__class__ is b.__class__ and a == b
+
+
+def _same_arrays(a, b):
+    if a.__class__ is not b.__class__ or a.shape != b.shape:
+        return False
+    # Equal integer arrays of one type have equal bytes (unlike floats,
+    # e.g. 0.0 and -0.0), which is faster to check
+    if a.dtype == b.dtype and a.dtype.kind in 'biu':
+        return a.tobytes() == b.tobytes()
+    return bool(asarray(a == b).all())
+
+
+def _same_sequences(a, b):
+    # Values that `same` considers the same are equal, so inequality is a
+    # quick rejection and `same` only checks the classes of equal values
+    if a.__class__ is not b.__class__:
+        return False
+    try:
+        equal = a == b
+    except ValueError:
+        # Items of a (e.g. arrays) can be compared without a truth value
+        return same(a, b)
+    return equal and same(a, b)
+
+
+def _primitive(value):
+    if value.__class__ in _PRIMITIVE_CLASSES:
+        return True
+    if value.__class__ in (list, tuple):
+        return all(_primitive(item) for item in value)
+    return False
+
+
+def _sequence_comparator(expected):
+    return _same_sequences if _primitive(expected) else same
+
+
+def _dict_comparator(expected):
+    comparators = {
+        key: comparator_for(value) for key, value in expected.items()
+    }
+
+    def same_dicts(a, b):
+        if a.__class__ is not b.__class__:
+            return False
+        # Like `same`, only the keys of a have to be in b
+        for key in a:
+            comparator = comparators.get(key)
+            if comparator is None or not comparator(a[key], b[key]):
+                return False
+        return True
+
+    return same_dicts
+
+
+_PRIMITIVE_CLASSES = (bool, int, float, complex, str, bytes, type(None))
+
+for _class in _PRIMITIVE_CLASSES:
+    register_comparator(_class, lambda expected: _same_values)
+register_comparator(ndarray, lambda expected: _same_arrays)
+register_comparator(list, _sequence_comparator)
+register_comparator(tuple, _sequence_comparator)
+register_comparator(dict, _dict_comparator)
+
+
+def read_json(path):
+    """Content of a JSON file or None if it's missing or malformed"""
+    try:
+        with open(path) as file:
+            return load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_json(path, content):
+    """Write a JSON file atomically (readers never see it half-written)"""
+    temporary_path = path + '.' + str(getpid()) + '.tmp'
+    with open(temporary_path, 'w') as file:
+        file.write(dumps(content))
+    replace(temporary_path, path)
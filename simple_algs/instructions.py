@@ -1,20 +1,57 @@
 from inspect import signature
 
+from .helpers import execution_key, same
 from .strategy import Strategy
 
 
 class Instruction:
+    __slots__ = ('_execution', 'takes_operations_counter', '_key')
+
     def __init__(self, execution):
         self.execution = execution
 
+    @property
+    def execution(self):
+        return self._execution
+
+    @execution.setter
+    def execution(self, execution):
+        # Resolved once, so that executing doesn't inspect the signature
+        self._execution = execution
+        self.takes_operations_counter = _takes_operations_counter(execution)
+        self._key = (self.__class__, execution_key(execution))
+
     def execute(self, operations_counter):
-        if 'operations_counter' in signature(self.execution).parameters:
-            return self.execution(operations_counter)
+        if self.takes_operations_counter:
+            return self._execution(operations_counter=operations_counter)
         operations_counter.increment()
-        return self.execution()
+        return self._execution()
+
+    def compile(self, compiler):
+        compiler.emit(self.compile_expression(compiler))
+
+    def compile_expression(self, compiler):
+        execution = compiler.constant(self.execution)
+        if self.takes_operations_counter:
+            return execution + "(operations_counter=operations_counter)"
+        compiler.emit("increment()")
+        return execution + "()"
+
+    def canonical_key(self):
+        """Hashable key, equal for instructions that execute the same"""
+        return self._key
+
+    def same(self, other):
+        return (
+                same(self.execution, other.execution) and
+                same(
+                    getattr(self, '__dict__', {}),
+                    getattr(other, '__dict__', {})
+                )
+        )
 
     def __call__(self, *args, **kwargs):
-        self.execute(*args, **kwargs)
+        return self.execute(*args, **kwargs)
 
     def __str__(self):
         return getattr(self.execution, '__name__', str(self.execution))
@@ -24,12 +61,17 @@ class Instruction:
 
 
 class Action(Instruction):
-    pass
+    __slots__ = ()
 
 
 class ControlStructure(Instruction):
+    __slots__ = ('condition', 'body')
+
     NEEDS_CONDITION = False
     KEYWORD = 'UNNAMED_CONTROL_STRUCTURE'
+    # Whether it can be left out when its body is empty (apart from the
+    # operations that the condition takes), which generators can skip
+    EMPTY_BODY_DOES_NOTHING = False
 
     def __init__(self, condition=None, body=None):
         self.condition = condition
@@ -39,6 +81,25 @@ class ControlStructure(Instruction):
     def execute(self, operations_counter):
         raise NotImplementedError("Call to an abstract method")
 
+    def compile(self, compiler):
+        compiler.emit(compiler.constant(self) + "(operations_counter)")
+
+    def canonical_key(self):
+        condition = self.condition
+        return (
+            self.__class__,
+            condition.canonical_key() if isinstance(condition, Instruction)
+            else execution_key(condition),
+            self.body.canonical_key()
+        )
+
+    def same(self, other):
+        return (
+                same(self.condition, other.condition) and
+                same(self.body, other.body) and
+                super(ControlStructure, self).same(other)
+        )
+
     def __str__(self):
         return (
                 self.KEYWORD + " " +
@@ -59,4 +120,13 @@ class ControlStructure(Instruction):
 
 
 class Condition(Instruction):
-    pass
+    __slots__ = ()
+
+
+def _takes_operations_counter(execution):
+    if execution is None:
+        return False
+    try:
+        return 'operations_counter' in signature(execution).parameters
+    except (TypeError, ValueError):
+        return False
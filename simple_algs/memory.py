@@ -1,6 +1,26 @@
 from functools import partial
-
-from numpy import empty
+from operator import mul
+
+from numpy import (
+    arange,
+    array,
+    asarray,
+    copyto,
+    count_nonzero,
+    empty,
+    int8,
+    int64,
+    ndarray,
+    ones,
+    shape,
+    size,
+    stack,
+    where,
+    zeros
+)
+
+from .helpers import same
+from .rules import RuleSet
 
 
 class Condition:
@@ -10,12 +30,23 @@ class Condition:
 
 
 class MemoryAbstract:
-    def __init__(self, actions=None, control_structures=None, conditions=None):
+    # Batched memories hold one lane per sample, take a list of inputs and
+    # return a list of outputs
+    BATCHED = False
+
+    def __init__(
+            self,
+            actions=None,
+            control_structures=None,
+            conditions=None,
+            rules=None
+    ):
         self.actions = actions or self.default_actions()
         self.control_structures = (
                 control_structures or self.default_control_structures()
         )
         self.conditions = conditions or self.default_conditions()
+        self.rules = rules if rules is not None else self.default_rules()
 
     def input(self, data):
         raise NotImplementedError("Call to an abstract method")
@@ -26,6 +57,31 @@ class MemoryAbstract:
     def reset(self):
         raise NotImplementedError("Call to an abstract method")
 
+    def fingerprint(self):
+        """Hashable summary of the state that instructions can change"""
+        raise NotImplementedError("Call to an abstract method")
+
+    def snapshot(self):
+        """State that `restore` brings back, unaffected by later changes"""
+        raise NotImplementedError("Call to an abstract method")
+
+    def restore(self, snapshot):
+        raise NotImplementedError("Call to an abstract method")
+
+    def expected_outputs(self, outputs):
+        """Expected outputs of a batch in the form that `matches` takes
+
+        None if the memory can't match these outputs itself.
+        """
+        raise NotImplementedError("Call to an abstract method")
+
+    def matches(self, expected_outputs):
+        """Mask of the lanes of a batch whose output is the expected one
+
+        It's the same as comparing every output with `same`, but faster.
+        """
+        raise NotImplementedError("Call to an abstract method")
+
     def default_actions(self):
         return []
 
@@ -35,6 +91,14 @@ class MemoryAbstract:
     def default_conditions(self):
         return []
 
+    def default_rules(self):
+        """`RuleSet` with facts about the actions of the memory"""
+        return RuleSet()
+
+    def distance(self, output, expected_output):
+        """How far an output is from the expected one (0 if it's the same)"""
+        return 0 if same(output, expected_output) else 1
+
 
 class MemoryCollection(MemoryAbstract):
     def __init__(
@@ -101,6 +165,22 @@ class MemoryCollection(MemoryAbstract):
         for element_name in self.elements:
             self.elements[element_name].reset()
 
+    def fingerprint(self):
+        return tuple(
+            self.elements[element_name].fingerprint()
+            for element_name in sorted(self.elements)
+        )
+
+    def snapshot(self):
+        return {
+            element_name: self.elements[element_name].snapshot()
+            for element_name in self.elements
+        }
+
+    def restore(self, snapshot):
+        for element_name in snapshot:
+            self.elements[element_name].restore(snapshot[element_name])
+
     def default_actions(self):
         actions = self.additional_actions
         for element_name in self.elements:
@@ -122,6 +202,23 @@ class MemoryCollection(MemoryAbstract):
             conditions += element.conditions
         return conditions
 
+    def default_rules(self):
+        rules = RuleSet()
+        for element_name in self.elements:
+            rules.update(self.elements[element_name].default_rules())
+        return rules
+
+    def distance(self, output, expected_output):
+        if isinstance(self.output_element, list):
+            return sum(
+                self.elements[element_name].distance(
+                    output[element_name],
+                    expected_output[element_name]
+                )
+                for element_name in self.output_element
+            )
+        return self.output_element.distance(output, expected_output)
+
     def update_instructions(self):
         super(MemoryCollection, self).__init__()
 
@@ -140,6 +237,7 @@ class Tape(MemoryAbstract):
         self.data = data if data is not None else empty(shape)
         self.pointer = pointer or [0 for _ in range(len(self.shape))]
         self.selected_value = selected_value
+        self._restored_data = None
         super(Tape, self).__init__()
 
     def set(self, value):
@@ -183,6 +281,41 @@ class Tape(MemoryAbstract):
     def reset(self):
         self.data = empty(self.shape)
 
+    def fingerprint(self):
+        return (
+            self.data.shape,
+            self.data.tobytes(),
+            tuple(self.pointer),
+            self.selected_value
+        )
+
+    def snapshot(self):
+        return (
+            self.data.copy(),
+            self.shape,
+            list(self.pointer),
+            self.selected_value
+        )
+
+    def restore(self, snapshot):
+        data, shape, pointer, selected_value = snapshot
+        # Only the array allocated here is reused, so that arrays shared
+        # with anything else (e.g. assigned to data by a listener) are never
+        # overwritten
+        restored_data = self._restored_data
+        if (
+                restored_data is None or
+                restored_data.shape != data.shape or
+                restored_data.dtype != data.dtype
+        ):
+            restored_data = self._restored_data = data.copy()
+        else:
+            copyto(restored_data, data)
+        self.data = restored_data
+        self._shape = shape
+        self.pointer[:] = pointer
+        self.selected_value = selected_value
+
     def default_actions(self):
         return (
                 [
@@ -215,6 +348,360 @@ class Tape(MemoryAbstract):
             for i in range(self.max_value + 1)
         ]
 
+    def default_rules(self):
+        return _tape_rules(self)
+
+    def distance(self, output, expected_output):
+        return _hamming_distance(output, expected_output)
+
+
+class FastTape(Tape):
+    """`Tape` that reuses one buffer for the data of all executions
+
+    The data is a view of the beginning of a flat buffer (one per dtype,
+    the first one has `capacity` floats), which is only reallocated when
+    it's too small for the data, so assigning data copies into the buffer,
+    views of the shapes of recent data are reused and `reset` does
+    nothing (the content is undefined after it, like with `Tape`). The
+    pointer is a flat index into the buffer (computed from an assigned
+    pointer when it's used), which moves along an axis by its stride.
+    Unlike with `Tape`:
+
+    - assigned data is copied, so changing it later doesn't change the tape
+      and the output is only valid until the tape changes,
+    - the shape is always the one of the data (assigning a shape gives the
+      data a new view of the buffer with that shape),
+    - the pointer is a tuple, so it must be assigned instead of changed in
+      place.
+    """
+
+    def __init__(
+            self,
+            max_value,
+            shape,
+            data=None,
+            pointer=None,
+            selected_value=0,
+            capacity=0
+    ):
+        buffer = empty(capacity)
+        self._buffers = {buffer.dtype: buffer}
+        self._cursor = 0
+        self._pointer = None
+        # Views of the buffers (with their axes, strides and buffer) by shape
+        # and dtype
+        self._views = {}
+        # The data, the stride, length and the move from the last position
+        # to the first of every axis, the strides and the buffer of the
+        # shape (even if it's the shape of the data, e.g. empty)
+        self._view(shape, buffer.dtype)
+        super(FastTape, self).__init__(
+            max_value,
+            shape,
+            data,
+            pointer,
+            selected_value
+        )
+
+    def set(self, value):
+        cursor = self._cursor
+        if cursor is None:
+            cursor = self._locate()
+        self._buffer[cursor] = value
+
+    def get(self):
+        cursor = self._cursor
+        if cursor is None:
+            cursor = self._locate()
+        return self._buffer[cursor]
+
+    def increment_pointer(self, axis=None):
+        try:
+            stride, length, wrap = self._axes[axis]
+        except IndexError:
+            raise ValueError("Invalid axis for shape " + str(self.shape))
+        cursor = self._cursor
+        if cursor is None:
+            cursor = self._locate()
+        if cursor // stride % length == length - 1:
+            self._cursor = cursor - wrap
+        else:
+            self._cursor = cursor + stride
+
+    def decrement_pointer(self, axis=None):
+        try:
+            stride, length, wrap = self._axes[axis]
+        except IndexError:
+            raise ValueError("Invalid axis for shape " + str(self.shape))
+        cursor = self._cursor
+        if cursor is None:
+            cursor = self._locate()
+        if cursor // stride % length == 0:
+            self._cursor = cursor + wrap
+        else:
+            self._cursor = cursor - stride
+
+    def input(self, data):
+        self.data = data
+
+    def reset(self):
+        pass
+
+    def fingerprint(self):
+        return (
+            self._data.shape,
+            self._data.tobytes(),
+            self._locate(),
+            self.selected_value
+        )
+
+    def snapshot(self):
+        return self._data.copy(), self._locate(), self.selected_value
+
+    def restore(self, snapshot):
+        data, cursor, selected_value = snapshot
+        if self._data.shape != data.shape or self._data.dtype != data.dtype:
+            self._view(data.shape, data.dtype)
+        copyto(self._data, data)
+        self._cursor = cursor
+        self.selected_value = selected_value
+
+    @property
+    def data(self):
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        data = asarray(data)
+        if data.shape != self._data.shape or data.dtype != self._data.dtype:
+            self._reshape(data.shape, data.dtype)
+        copyto(self._data, data)
+
+    @property
+    def pointer(self):
+        cursor = self._locate()
+        return tuple(
+            cursor // stride % length if length else 0
+            for stride, length, _ in self._axes
+        )
+
+    @pointer.setter
+    def pointer(self, pointer):
+        # Control structures often assign pointers that aren't used before
+        # the next assignment, so the cursor is located when it's needed
+        self._pointer = pointer
+        self._cursor = None
+
+    @property
+    def shape(self):
+        return self._shape
+
+    @shape.setter
+    def shape(self, shape):
+        if tuple(shape) != self._data.shape:
+            self._reshape(shape, self._data.dtype)
+        self._shape = shape
+
+    def _locate(self):
+        """Cursor of the assigned pointer (if it's not located yet)"""
+        if self._cursor is None:
+            self._cursor = sum(map(mul, self._pointer, self._strides))
+        return self._cursor
+
+    def _reshape(self, shape, dtype):
+        """View a buffer as data of the shape, keeping the pointer"""
+        pointer = self.pointer
+        self._view(shape, dtype)
+        self.pointer = pointer + (0,) * (len(self._axes) - len(pointer))
+
+    def _view(self, shape, dtype):
+        # Views are kept, because samples of different shapes (and data of
+        # different dtypes) take turns
+        key = (tuple(shape), dtype)
+        view = self._views.get(key)
+        if view is None:
+            view = self._new_view(*key)
+        self._data, self._axes, self._strides, self._buffer = view
+        self._shape = shape
+
+    def _new_view(self, shape, dtype):
+        size = 1
+        stride = 1
+        axes = []
+        for length in reversed(shape):
+            size *= length
+            # The pointer stays at 0 on empty axes, as in `Tape`
+            length = max(length, 1)
+            axes.insert(0, (stride, length, stride * (length - 1)))
+            stride *= length
+        buffer = self._buffers.get(dtype)
+        if buffer is None or buffer.shape[0] < size or len(self._views) >= 64:
+            capacity = size if buffer is None else max(size, buffer.shape[0])
+            buffer = self._buffers[dtype] = empty(capacity, dtype=dtype)
+            # Views of the replaced buffer
+            self._views = {
+                key: view for key, view in self._views.items()
+                if key[1] != dtype
+            }
+        view = self._views[shape, dtype] = (
+            buffer[:size].reshape(shape),
+            tuple(axes),
+            tuple(axis[0] for axis in axes),
+            buffer
+        )
+        return view
+
+
+class BatchTape(MemoryAbstract):
+    """`Tape` that holds the data of many samples at once
+
+    The data is stacked along a leading lane axis and every lane has its own
+    pointer. Actions apply to the lanes that are active in the
+    `BatchOperationsCounter` as single NumPy operations and conditions
+    return a mask of lanes, so strategies have to use
+    `BatchConditionalStatement` and `BatchWhileLoop`. All inputs of a batch
+    must have the same shape.
+    """
+    BATCHED = True
+
+    def __init__(self, max_value, shape, lanes=1):
+        self.max_value = max_value
+        self.shape = shape
+        self.data = empty((lanes,) + tuple(shape))
+        self.pointer = zeros((lanes, len(shape)), dtype=int)
+        self.selected_value = zeros(lanes)
+        super(BatchTape, self).__init__()
+
+    @property
+    def lanes(self):
+        return self.data.shape[0]
+
+    def set(self, value, operations_counter=None):
+        lanes = self._count(operations_counter)
+        self.data[self._cells(lanes)] = self._lane_values(value, lanes)
+
+    def get(self, operations_counter=None):
+        self._count(operations_counter)
+        return self.data[self._cells(arange(self.lanes))]
+
+    def increment_pointer(self, axis=None, operations_counter=None):
+        lanes = self._count(operations_counter)
+        self._check_axis(axis)
+        positions = self.pointer[lanes, axis] + 1
+        positions[positions >= self.shape[axis]] = 0
+        self.pointer[lanes, axis] = positions
+
+    def decrement_pointer(self, axis=None, operations_counter=None):
+        lanes = self._count(operations_counter)
+        self._check_axis(axis)
+        positions = self.pointer[lanes, axis] - 1
+        positions[positions < 0] = self.shape[axis] - 1
+        self.pointer[lanes, axis] = positions
+
+    def select_value(self, value, operations_counter=None):
+        lanes = self._count(operations_counter)
+        self.selected_value[lanes] = self._lane_values(value, lanes)
+
+    def set_selected(self, operations_counter=None):
+        lanes = self._count(operations_counter)
+        self.data[self._cells(lanes)] = self.selected_value[lanes]
+
+    def indicated_value_equals(self, value, operations_counter=None):
+        """Mask of the lanes where the indicated value equals value"""
+        return self.get(operations_counter) == value
+
+    def input(self, data):
+        try:
+            self.data = stack([array(lane) for lane in data])
+        except ValueError:
+            raise ValueError("All inputs of a batch must have the same shape")
+        self.shape = self.data.shape[1:]
+        self.pointer = zeros((self.lanes, len(self.shape)), dtype=int)
+        self.selected_value = zeros(self.lanes)
+
+    def output(self):
+        return list(self.data)
+
+    def reset(self):
+        self.data = empty(self.data.shape)
+
+    def fingerprint(self):
+        return (
+            self.data.shape,
+            self.data.tobytes(),
+            self.pointer.tobytes(),
+            self.selected_value.tobytes()
+        )
+
+    def snapshot(self):
+        return (
+            self.data.copy(),
+            self.pointer.copy(),
+            self.selected_value.copy()
+        )
+
+    def restore(self, snapshot):
+        data, pointer, selected_value = snapshot
+        if self.data.shape == data.shape and self.data.dtype == data.dtype:
+            copyto(self.data, data)
+        else:
+            self.data = data.copy()
+        self.shape = data.shape[1:]
+        if self.pointer.shape == pointer.shape:
+            copyto(self.pointer, pointer)
+            copyto(self.selected_value, selected_value)
+        else:
+            self.pointer = pointer.copy()
+            self.selected_value = selected_value.copy()
+
+    def default_actions(self):
+        return (
+                [
+                    partial(self.set, value=i)
+                    for i in range(self.max_value + 1)
+                ] +
+                [self.get] +
+                [
+                    partial(self.increment_pointer, axis=i)
+                    for i in range(len(self.shape))
+                ] +
+                [
+                    partial(self.decrement_pointer, axis=i)
+                    for i in range(len(self.shape))
+                ]
+        )
+
+    def default_conditions(self):
+        return [
+            partial(self.indicated_value_equals, value=i)
+            for i in range(self.max_value + 1)
+        ]
+
+    def default_rules(self):
+        return _tape_rules(self)
+
+    def distance(self, output, expected_output):
+        return _hamming_distance(output, expected_output)
+
+    def _count(self, operations_counter):
+        """Count the operation and return the indices of the active lanes"""
+        if operations_counter is None:
+            return arange(self.lanes)
+        operations_counter.increment()
+        return operations_counter.active.nonzero()[0]
+
+    def _cells(self, lanes):
+        return (lanes,) + tuple(self.pointer[lanes].T)
+
+    def _lane_values(self, value, lanes):
+        if isinstance(value, ndarray) and value.shape == (self.lanes,):
+            return value[lanes]
+        return value
+
+    def _check_axis(self, axis):
+        if not 0 <= axis < len(self.shape):
+            raise ValueError("Invalid axis for shape " + str(self.shape))
+
 
 class Calculator(MemoryAbstract):
     def __init__(
@@ -240,6 +727,15 @@ class Calculator(MemoryAbstract):
     def reset(self):
         self.input(0)
 
+    def fingerprint(self):
+        return self.result, self.displayed, self._reset, self._operation
+
+    def snapshot(self):
+        return self.fingerprint()
+
+    def restore(self, snapshot):
+        self.result, self.displayed, self._reset, self._operation = snapshot
+
     def type(self, digit):
         if self._reset:
             self.displayed = digit
@@ -255,16 +751,16 @@ class Calculator(MemoryAbstract):
         self._reset = True
 
     def add(self):
-        self.operate(lambda a, b: a + b)
+        self.operate(_add)
 
     def deduct(self):
-        self.operate(lambda a, b: a - b)
+        self.operate(_deduct)
 
     def multiply(self):
-        self.operate(lambda a, b: a * b)
+        self.operate(_multiply)
 
     def divide(self):
-        self.operate(lambda a, b: a // b if b != 0 else 0)
+        self.operate(_divide)
 
     def operate(self, operation):
         self.equal()
@@ -290,6 +786,240 @@ class Calculator(MemoryAbstract):
     def default_control_structures(self):
         return []
 
+    def default_rules(self):
+        return _calculator_rules(self)
+
+    def distance(self, output, expected_output):
+        return abs(output - expected_output)
+
+
+class BatchCalculator(MemoryAbstract):
+    """`Calculator` that computes for many samples at once
+
+    The result, the displayed number and the pending operation are arrays
+    with a lane per sample, so every action is a few NumPy operations for
+    all active lanes of the `BatchOperationsCounter`. Numbers are 64-bit
+    integers, so unlike the ones of `Calculator` they wrap around when they
+    overflow. Division by zero gives 0 in the lanes where it happens.
+    """
+    BATCHED = True
+
+    def __init__(self, lanes=1):
+        super(BatchCalculator, self).__init__()
+        self.input([0] * lanes)
+
+    @property
+    def lanes(self):
+        return self.displayed.shape[0]
+
+    def input(self, input_):
+        self.displayed = array([value or 0 for value in input_], dtype=int64)
+        self.result = self.displayed.copy()
+        self._reset = ones(self.lanes, dtype=bool)
+        self._operation = zeros(self.lanes, dtype=int8)
+
+    def output(self):
+        self.equal()
+        return self.displayed.tolist()
+
+    def expected_outputs(self, outputs):
+        # Outputs are ints, so others (or too big ones) are compared by
+        # comparators
+        if any(output.__class__ is not int for output in outputs):
+            return None
+        try:
+            return array(outputs, dtype=int64)
+        except OverflowError:
+            return None
+
+    def matches(self, expected_outputs):
+        self.equal()
+        return self.displayed == expected_outputs
+
+    def reset(self):
+        self.input([0] * self.lanes)
+
+    def fingerprint(self):
+        return (
+            self.result.tobytes(),
+            self.displayed.tobytes(),
+            self._reset.tobytes(),
+            self._operation.tobytes()
+        )
+
+    def snapshot(self):
+        return (
+            self.result.copy(),
+            self.displayed.copy(),
+            self._reset.copy(),
+            self._operation.copy()
+        )
+
+    def restore(self, snapshot):
+        if self.result.shape != snapshot[0].shape:
+            self.result, self.displayed, self._reset, self._operation = (
+                values.copy() for values in snapshot
+            )
+            return
+        for state, values in zip(
+                (self.result, self.displayed, self._reset, self._operation),
+                snapshot
+        ):
+            copyto(state, values)
+
+    def type(self, digit, operations_counter=None):
+        lanes = self._count(operations_counter)
+        self.displayed[lanes] = where(
+            self._reset[lanes],
+            digit,
+            self.displayed[lanes] * 10 + digit
+        )
+        self._reset[lanes] = False
+
+    def equal(self, operations_counter=None):
+        self._equal(self._count(operations_counter))
+
+    def add(self, operations_counter=None):
+        self._operate(_ADD, operations_counter)
+
+    def deduct(self, operations_counter=None):
+        self._operate(_DEDUCT, operations_counter)
+
+    def multiply(self, operations_counter=None):
+        self._operate(_MULTIPLY, operations_counter)
+
+    def divide(self, operations_counter=None):
+        self._operate(_DIVIDE, operations_counter)
+
+    def _operate(self, operation, operations_counter):
+        lanes = self._count(operations_counter)
+        self._equal(lanes)
+        self._operation[lanes] = operation
+
+    def _equal(self, lanes):
+        # count_nonzero is faster than any for small arrays
+        operations = self._operation[lanes]
+        if count_nonzero(operations):
+            result = self.result[lanes]
+            displayed = self.displayed[lanes]
+            for code, operation in _BATCH_OPERATIONS:
+                pending = operations == code
+                if count_nonzero(pending):
+                    displayed[pending] = operation(
+                        result[pending],
+                        displayed[pending]
+                    )
+            self.displayed[lanes] = displayed
+            self._operation[lanes] = 0
+        self.result[lanes] = self.displayed[lanes]
+        self._reset[lanes] = True
+
+    def _count(self, operations_counter):
+        """Count the operation and return an index of the active lanes"""
+        if operations_counter is None:
+            return slice(None)
+        operations_counter.increment()
+        active = operations_counter.active
+        # A slice (unlike indices) gives views, which is faster
+        if count_nonzero(active) == active.shape[0]:
+            return slice(None)
+        return active.nonzero()[0]
+
+    def default_actions(self):
+        return (
+                [partial(self.type, digit=i) for i in range(0, 10)] +
+                [self.add, self.deduct, self.multiply, self.divide]
+        )
+
+    def default_rules(self):
+        return _calculator_rules(self)
+
+    def distance(self, output, expected_output):
+        return abs(output - expected_output)
+
+
+def _tape_rules(tape):
+    """Facts about the actions of `Tape` and `BatchTape`"""
+    rules = RuleSet()
+    writes = [
+        partial(tape.set, value=i)
+        for i in range(tape.max_value + 1)
+    ] + [tape.set_selected]
+    for first in writes:
+        for second in writes:
+            rules.overwrites(first, second)
+    for action in tape.default_actions():
+        rules.overwrites(tape.get, action)
+
+    moves = [
+        [
+            partial(tape.increment_pointer, axis=axis),
+            partial(tape.decrement_pointer, axis=axis)
+        ]
+        for axis in range(len(tape.shape))
+    ]
+    for axis, (increment, decrement) in enumerate(moves):
+        rules.inverses(increment, decrement)
+        for other_axis_moves in moves[axis + 1:]:
+            for move in (increment, decrement):
+                for other_move in other_axis_moves:
+                    rules.commute(move, other_move)
+    return rules
+
+
+def _calculator_rules(calculator):
+    """Facts about the actions of `Calculator` and `BatchCalculator`"""
+    # Only equal (which isn't a default action) has facts, because
+    # operators apply the pending operation and typing appends digits
+    rules = RuleSet()
+    rules.idempotent(calculator.equal)
+    for operator in (
+            calculator.add,
+            calculator.deduct,
+            calculator.multiply,
+            calculator.divide
+    ):
+        rules.overwrites(calculator.equal, operator)
+    return rules
+
+
+def _hamming_distance(output, expected_output):
+    """Number of differing cells, or of all cells if the shapes differ"""
+    if shape(output) != shape(expected_output):
+        return max(size(output), size(expected_output))
+    return int(count_nonzero(array(output) != array(expected_output)))
+
+
+def _add(a, b):
+    return a + b
+
+
+def _deduct(a, b):
+    return a - b
+
+
+def _multiply(a, b):
+    return a * b
+
+
+def _divide(a, b):
+    return a // b if b != 0 else 0
+
+
+def _batch_divide(a, b):
+    zero = b == 0
+    return where(zero, 0, a // where(zero, 1, b))
+
+
+# Codes of pending operations of `BatchCalculator` (0 is none)
+_ADD, _DEDUCT, _MULTIPLY, _DIVIDE = range(1, 5)
+_BATCH_OPERATIONS = (
+    (_ADD, _add),
+    (_DEDUCT, _deduct),
+    (_MULTIPLY, _multiply),
+    (_DIVIDE, _batch_divide)
+)
+
 
 class Ignored(MemoryAbstract):
     def __init__(self, data=None):
@@ -305,6 +1035,15 @@ class Ignored(MemoryAbstract):
     def reset(self):
         self.data = None
 
+    def fingerprint(self):
+        return None
+
+    def snapshot(self):
+        return self.data
+
+    def restore(self, snapshot):
+        self.data = snapshot
+
     def default_actions(self):
         return []
 
@@ -0,0 +1,242 @@
+from contextlib import contextmanager
+from functools import partial
+from threading import get_ident
+from time import perf_counter
+
+from .instructions import Condition, ControlStructure, Instruction
+
+
+class Profiler:
+    """Time that fits spend in instructions and memory operations
+
+    While a `SupervisedLearning` with the profiler fits, every executed
+    instruction (including conditions) and the memory operations that the
+    search calls are timed ('score' is the whole scoring of candidates).
+    Every candidate's times are attributed to 'rejected' if it didn't
+    improve the best score, otherwise to 'improved', and times outside
+    candidates (e.g. preparing the memory) to 'fit'. Strategies aren't
+    compiled while profiling, so that instructions can be timed, and
+    parallel fits aren't supported.
+
+    Instructions are timed by replacing `Instruction.__call__`, which is
+    shared by the whole process, so only one profiler can be attached at
+    a time and instructions executed by other threads meanwhile (which
+    aren't timed) are slowed down slightly.
+
+    `report` is a table of the instructions and operations and
+    `collapsed_stacks` is the input of flame graph tools (e.g.
+    flamegraph.pl).
+    """
+
+    MEMORY_METHODS = (
+        'input',
+        'output',
+        'reset',
+        'snapshot',
+        'restore',
+        'fingerprint',
+        'matches'
+    )
+
+    def __init__(self):
+        # Calls, cumulative and self seconds and cumulative seconds in
+        # rejected candidates of every label
+        self.entries = {}
+        # Self seconds of every stack (a tuple of labels from the root)
+        self.stacks = {}
+        self._frames = []
+        self._depths = {}
+        self._labels = {}
+        self._root = 'fit'
+        # Cumulative seconds of the labels and self seconds of the stacks
+        # of the current candidate
+        self._candidate_times = {}
+        self._candidate_stacks = {}
+
+    @contextmanager
+    def attached(self, supervised_learning):
+        """Profile what the supervised learning executes in the context"""
+        if supervised_learning.parallel:
+            raise ValueError("Parallel fits can't be profiled")
+        if hasattr(Instruction.__call__, 'profiler'):
+            raise ValueError("Another profiler is attached")
+        memory = supervised_learning.memory
+        compile_strategies = supervised_learning.compile_strategies
+        supervised_learning.compile_strategies = False
+        instruction_call = Instruction.__call__
+        Instruction.__call__ = self._instruction_call()
+        wrapped = [
+            (memory, name) for name in self.MEMORY_METHODS
+            if hasattr(memory, name)
+        ] + [
+            (supervised_learning, '_score'),
+            (supervised_learning, '_score_from')
+        ]
+        # Methods are wrapped by attributes of the objects, which hide the
+        # ones of their classes
+        originals = [vars(owner).get(name) for owner, name in wrapped]
+        for owner, name in wrapped:
+            method = getattr(owner, name)
+            if owner is supervised_learning:
+                wrapper = self._candidate(method, supervised_learning)
+            else:
+                wrapper = self._timed(method, 'memory.' + name)
+            setattr(owner, name, wrapper)
+        try:
+            yield self
+        finally:
+            Instruction.__call__ = instruction_call
+            for (owner, name), original in zip(wrapped, originals):
+                if original is None:
+                    delattr(owner, name)
+                else:
+                    setattr(owner, name, original)
+            supervised_learning.compile_strategies = compile_strategies
+
+    def report(self, limit=None):
+        """Table of the labels, the ones with the most self time first"""
+        lines = [
+            '{:>10} {:>10} {:>10} {:>9}  {}'.format(
+                'calls',
+                'total s',
+                'self s',
+                'rejected',
+                'name'
+            )
+        ]
+        entries = sorted(
+            self.entries.items(),
+            key=lambda item: item[1][2],
+            reverse=True
+        )
+        for label, (calls, total, self_time, rejected) in entries[:limit]:
+            lines.append(
+                '{:>10} {:>10.4f} {:>10.4f} {:>9.1%}  {}'.format(
+                    calls,
+                    total,
+                    self_time,
+                    rejected / total if total else 0,
+                    label
+                )
+            )
+        return '\n'.join(lines)
+
+    def collapsed_stacks(self):
+        """Lines of stacks separated by ';' and their self microseconds"""
+        return '\n'.join(
+            ';'.join(stack) + ' ' + str(int(round(seconds * 1e6)))
+            for stack, seconds in sorted(self.stacks.items())
+            if seconds >= 5e-7
+        )
+
+    def _instruction_call(self):
+        """Replacement of `Instruction.__call__` that times instructions"""
+        thread = get_ident()
+
+        def call(instruction, *args, **kwargs):
+            if get_ident() != thread:
+                return instruction.execute(*args, **kwargs)
+            self._enter(self._label(instruction))
+            try:
+                return instruction.execute(*args, **kwargs)
+            finally:
+                self._exit()
+        call.profiler = self
+        return call
+
+    def _timed(self, method, label):
+        def timed(*args, **kwargs):
+            self._enter(label)
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._exit()
+        return timed
+
+    def _candidate(self, score, supervised_learning):
+        def scored_candidate(*args, **kwargs):
+            self._root = 'candidate'
+            self._enter('score')
+            try:
+                result = score(*args, **kwargs)
+            finally:
+                self._exit()
+                self._root = 'fit'
+            # The best score is updated after scoring
+            if result > supervised_learning.best_score:
+                self._finish_candidate('improved', False)
+            else:
+                self._finish_candidate('rejected', True)
+            return result
+        return scored_candidate
+
+    def _enter(self, label):
+        self._frames.append([label, perf_counter(), 0])
+        self._depths[label] = self._depths.get(label, 0) + 1
+
+    def _exit(self):
+        label, started, children = self._frames.pop()
+        elapsed = perf_counter() - started
+        if self._frames:
+            self._frames[-1][2] += elapsed
+        depth = self._depths[label] - 1
+        self._depths[label] = depth
+        entry = self.entries.get(label)
+        if entry is None:
+            entry = self.entries[label] = [0, 0, 0, 0]
+        entry[0] += 1
+        entry[2] += elapsed - children
+        stack = tuple(frame[0] for frame in self._frames) + (label,)
+        if self._root == 'fit':
+            # Recursive calls are already in the outermost one
+            if not depth:
+                entry[1] += elapsed
+            stack = ('fit',) + stack
+            self.stacks[stack] = (
+                self.stacks.get(stack, 0) + elapsed - children
+            )
+            return
+        if not depth:
+            self._candidate_times[label] = (
+                self._candidate_times.get(label, 0) + elapsed
+            )
+        self._candidate_stacks[stack] = (
+            self._candidate_stacks.get(stack, 0) + elapsed - children
+        )
+
+    def _finish_candidate(self, root, rejected):
+        for label, seconds in self._candidate_times.items():
+            entry = self.entries[label]
+            entry[1] += seconds
+            if rejected:
+                entry[3] += seconds
+        for stack, seconds in self._candidate_stacks.items():
+            stack = (root,) + stack
+            self.stacks[stack] = self.stacks.get(stack, 0) + seconds
+        self._candidate_times = {}
+        self._candidate_stacks = {}
+
+    def _label(self, instruction):
+        if isinstance(instruction, ControlStructure):
+            return instruction.KEYWORD
+        key = instruction.canonical_key()
+        label = self._labels.get(key)
+        if label is None:
+            label = _execution_label(instruction.execution)
+            if isinstance(instruction, Condition):
+                label = 'condition:' + label
+            self._labels[key] = label
+        return label
+
+
+def _execution_label(execution):
+    if isinstance(execution, partial):
+        arguments = [repr(argument) for argument in execution.args] + [
+            name + '=' + repr(value)
+            for name, value in sorted(execution.keywords.items())
+        ]
+        return (
+            _execution_label(execution.func) +
+            '(' + ','.join(arguments) + ')'
+        )
+    return getattr(execution, '__name__', None) or str(execution)
@@ -0,0 +1,47 @@
+from .instructions import ControlStructure
+
+
+class EquivalencePruner:
+    """Skip strategies that extend an observationally equivalent prefix
+
+    After a strategy is scored, the memory state it left on every training
+    input is recorded. If another, earlier strategy left exactly the same
+    states, every extension of the later one behaves like the same extension
+    of the earlier one, which is enumerated first (it's shorter or has a
+    lower index), so the extensions don't have to be scored.
+    """
+
+    def __init__(self):
+        self._representatives = {}
+        self._redundant = set()
+
+    def check(self, strategy):
+        """Return the key of the strategy or None if it should be skipped"""
+        keys = tuple(
+            self.instruction_key(instruction)
+            for instruction in strategy.instructions
+        )
+        for length in range(1, len(keys)):
+            if keys[:length] in self._redundant:
+                return None
+        return keys
+
+    def record(self, key, fingerprints):
+        fingerprints = tuple(fingerprints)
+        if fingerprints in self._representatives:
+            self._redundant.add(key)
+        else:
+            self._representatives[fingerprints] = key
+
+    @staticmethod
+    def instruction_key(instruction):
+        if isinstance(instruction, ControlStructure):
+            return (
+                instruction.__class__,
+                id(instruction.condition),
+                tuple(
+                    EquivalencePruner.instruction_key(body_instruction)
+                    for body_instruction in instruction.body.instructions
+                )
+            )
+        return id(instruction)
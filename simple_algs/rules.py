@@ -0,0 +1,87 @@
+from functools import partial
+
+
+class RuleSet:
+    """Algebraic facts about pairs of actions executed one after the other
+
+    - `inverses(a, b)`: a then b (or b then a) does nothing
+    - `idempotent(a)`: a then a is the same as a
+    - `overwrites(a, b)`: a then b is the same as b alone
+    - `commute(a, b)`: a then b is the same as b then a
+
+    Actions are given as the callables that the memory's actions execute
+    (facts about actions that a generator doesn't have are ignored). Every
+    strategy with such a pair has an equivalent one (apart from the number
+    of operations) without any, because removing actions and ordering
+    commuting ones always ends, so generators skip the former.
+    """
+
+    def __init__(self):
+        self.facts = {
+            'inverses': [],
+            'idempotent': [],
+            'overwrites': [],
+            'commute': []
+        }
+
+    def inverses(self, a, b):
+        self.facts['inverses'].append((a, b))
+
+    def idempotent(self, a):
+        self.facts['idempotent'].append((a, a))
+
+    def overwrites(self, a, b):
+        self.facts['overwrites'].append((a, b))
+
+    def commute(self, a, b):
+        self.facts['commute'].append((a, b))
+
+    def update(self, other):
+        for name, pairs in other.facts.items():
+            self.facts[name] += pairs
+
+    def redundant_pairs(self, actions):
+        """Pairs of indices of actions that never have to follow each other
+
+        Of two commuting actions, only the one with the lower index may come
+        first.
+        """
+        pairs = set()
+        for name, facts in self.facts.items():
+            for a, b in facts:
+                for first in _indices(actions, a):
+                    for second in _indices(actions, b):
+                        if name == 'inverses':
+                            pairs.add((first, second))
+                            pairs.add((second, first))
+                        elif name == 'commute':
+                            if first != second:
+                                pairs.add((
+                                    max(first, second),
+                                    min(first, second)
+                                ))
+                        else:
+                            pairs.add((first, second))
+        return pairs
+
+    def __bool__(self):
+        return any(self.facts.values())
+
+
+def _indices(actions, execution):
+    return [
+        index for index, action in enumerate(actions)
+        if _same_execution(action.execution, execution)
+    ]
+
+
+def _same_execution(a, b):
+    # Unlike `helpers.same`, methods of different objects (e.g. of two tapes
+    # in a memory collection) are different here
+    if isinstance(a, partial) and isinstance(b, partial):
+        return (
+                _same_execution(a.func, b.func) and
+                a.args == b.args and
+                a.keywords == b.keywords
+        )
+    return a == b
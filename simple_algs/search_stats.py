@@ -0,0 +1,210 @@
+from time import monotonic
+
+
+class SearchStats:
+    """Statistics of one search for the best strategy
+
+    They can be polled while the search runs (e.g. from a 'progress' event
+    listener of `SupervisedLearning`). `candidates` is the number of scored
+    candidates, `pruned` of the skipped equivalent ones, `rejected` of the
+    ones that the generator didn't yield (invalid or redundant strategies)
+    and `duplicates` of the ones it didn't yield because it already had
+    (see `duplicate_rate`), which together make the `generated` ones.
+    `operations` is the number of operations that the scored candidates
+    executed, `sample_rejections` has the number of candidates that every
+    training sample rejected and `length` is the length of the current
+    candidates.
+    `best_score` and `best_index` are the ones of the best strategy found in
+    this search and `counterexamples` is the number of samples that a
+    streaming fit added to the active ones.
+
+    `lengths` maps a strategy length (the number of instructions, including
+    ends of bodies) to a dict with the number of scored `candidates`, the
+    `best_score` among them and the `elapsed` seconds (with early exits,
+    candidates that can't beat the best score aren't scored exactly, so
+    their scores aren't recorded). `completed_length` is the longest length
+    whose strategies were all scored (None if there isn't any or the
+    generator doesn't enumerate by index) and `stop_reason` is one of
+    'accepted', 'exhausted', 'time_limit', 'max_candidates' and 'cached'.
+    """
+
+    def __init__(self, strategy_generator, operations_counter=None):
+        self.strategy_generator = strategy_generator
+        self.operations_counter = operations_counter
+        self.candidates = 0
+        self.pruned = 0
+        self.sample_rejections = []
+        self.best_score = 0
+        self.best_index = None
+        self.counterexamples = 0
+        self.lengths = {}
+        self.completed_length = None
+        self.stop_reason = None
+        self.elapsed = 0
+        self._started = monotonic()
+        self._length = None
+        self._length_started = self._started
+        self._length_start = 0
+        self._length_stop = 0
+        # Counts of other processes and counts when the search stopped
+        self._other_rejected = 0
+        self._other_duplicates = 0
+        self._other_operations = 0
+        self._stopped_counts = None
+        self._rejected_start = strategy_generator.rejected
+        self._duplicates_start = strategy_generator.duplicates
+        self._operations_start = self._total_operations()
+
+    @property
+    def rejected(self):
+        if self._stopped_counts is not None:
+            return self._stopped_counts[0]
+        return (
+            self.strategy_generator.rejected - self._rejected_start +
+            self._other_rejected
+        )
+
+    @property
+    def duplicates(self):
+        if self._stopped_counts is not None:
+            return self._stopped_counts[2]
+        return (
+            self.strategy_generator.duplicates - self._duplicates_start +
+            self._other_duplicates
+        )
+
+    @property
+    def operations(self):
+        if self._stopped_counts is not None:
+            return self._stopped_counts[1]
+        return (
+            self._total_operations() - self._operations_start +
+            self._other_operations
+        )
+
+    @property
+    def generated(self):
+        return (
+            self.candidates + self.pruned + self.rejected + self.duplicates
+        )
+
+    @property
+    def length(self):
+        return self._length
+
+    def running_time(self):
+        return monotonic() - self._started
+
+    def duplicate_rate(self):
+        """Fraction of the valid candidates that were duplicates"""
+        valid = self.generated - self.rejected
+        return self.duplicates / valid if valid else 0
+
+    def candidates_per_second(self):
+        elapsed = self.elapsed if self.stop_reason else self.running_time()
+        return self.candidates / elapsed if elapsed else 0
+
+    def record(self, index, score):
+        self.record_range(index, 1, score)
+
+    def record_range(
+            self,
+            index,
+            candidates,
+            best_score,
+            rejected=0,
+            duplicates=0,
+            operations=0,
+            sample_rejections=None
+    ):
+        """Record candidates scored from `index` on (all of the same length)
+
+        Counts of candidates that were generated in other processes are
+        added to the ones of this process.
+        """
+        if not self._length_start <= index < self._length_stop:
+            self._start_length(index)
+        self.candidates += candidates
+        length_stats = self.lengths[self._length]
+        length_stats['candidates'] += candidates
+        if best_score is not None and best_score > length_stats['best_score']:
+            length_stats['best_score'] = best_score
+        self._other_rejected += rejected
+        self._other_duplicates += duplicates
+        self._other_operations += operations
+        for sample_index, count in enumerate(sample_rejections or []):
+            self.sample_rejections[sample_index] += count
+
+    def record_best(self, index, score):
+        self.best_index = index
+        self.best_score = score
+
+    def stop(self, reason, position):
+        """Finish the statistics, `position` is the first unscored index"""
+        self._finish_length()
+        self._stopped_counts = (
+            self.rejected,
+            self.operations,
+            self.duplicates
+        )
+        self.stop_reason = reason
+        self.elapsed = self.running_time()
+        self.completed_length = None
+        if not self.strategy_generator.ENUMERATES_BY_INDEX:
+            return
+        length = 0
+        size = self.strategy_generator.size()
+        while True:
+            length_size = self.strategy_generator.size(length)
+            if length_size > position or length_size > size:
+                break
+            self.completed_length = length
+            length += 1
+
+    def resume(self):
+        """Continue stopped statistics with another round of the search"""
+        self._stopped_counts = None
+        self.stop_reason = None
+        self._length_started = monotonic()
+
+    def _start_length(self, index):
+        self._finish_length()
+        length = 0
+        while self.strategy_generator.size(length) <= index:
+            length += 1
+        self._length = length
+        self._length_started = monotonic()
+        self._length_start = (
+            self.strategy_generator.size(length - 1) if length else 0
+        )
+        self._length_stop = self.strategy_generator.size(length)
+        self.lengths.setdefault(length, {
+            'candidates': 0,
+            'best_score': 0,
+            'elapsed': 0
+        })
+
+    def _total_operations(self):
+        if self.operations_counter is None:
+            return 0
+        return self.operations_counter.total_operations
+
+    def _finish_length(self):
+        if self._length is not None:
+            self.lengths[self._length]['elapsed'] += (
+                monotonic() - self._length_started
+            )
+            self._length_started = monotonic()
+
+    def __repr__(self):
+        return (
+            'SearchStats(candidates={}, rejected={}, operations={}, '
+            'elapsed={:.3f}, completed_length={}, stop_reason={!r})'.format(
+                self.candidates,
+                self.rejected,
+                self.operations,
+                self.elapsed,
+                self.completed_length,
+                self.stop_reason
+            )
+        )
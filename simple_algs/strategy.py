@@ -1,24 +1,59 @@
 from math import inf
 
-from .helpers import same
+from numpy import ones, zeros
+
+from .helpers import execution_key, same
+
+
+# Factories of compiled strategies, by generated source (so by structure)
+_compiled_factories = {}
 
 
 class Strategy:
     def __init__(self, instructions=None):
         self.instructions = instructions or []
+        self._compiled = None
 
     def execute(self, operations_counter):
         for instruction in self.instructions:
             instruction(operations_counter)
 
+    def compile(self):
+        """Return a function of `operations_counter` equivalent to `execute`
+
+        Actions and the built-in control structures are inlined into one
+        flat Python function, other instructions are called as they are.
+        """
+        if self._compiled is None:
+            self._compiled = StrategyCompiler().build(self)
+        return self._compiled
+
     def append(self, instruction):
         self.instructions.append(instruction)
+        self._compiled = None
+
+    def same(self, other):
+        return same(self.instructions, other.instructions)
+
+    def canonical_key(self):
+        """Hashable key, equal for strategies with the same structure
+
+        Unlike `same`, it's only equal for instructions of the same objects
+        (e.g. memories), not of copies.
+        """
+        return tuple(
+            instruction.canonical_key()
+            if hasattr(instruction, 'canonical_key')
+            else execution_key(instruction)
+            for instruction in self.instructions
+        )
 
     def __add__(self, other):
         return Strategy(self.instructions + other.instructions)
 
     def __iadd__(self, other):
         self.instructions += other.instructions
+        self._compiled = None
 
     def __call__(self, max_operations=None):
         self.execute(max_operations)
@@ -41,6 +76,8 @@ class OperationsCounter:
     def __init__(self, limit=inf):
         self.executed_operations = 0
         self.limit = limit
+        # Operations executed before the last reset, in all executions
+        self.total_operations = 0
 
     def allow_execution(self):
         return self.executed_operations < self.limit
@@ -49,7 +86,111 @@ class OperationsCounter:
         self.executed_operations += 1
 
     def reset(self):
+        self.total_operations += self.executed_operations
         self.executed_operations = 0
 
+    def restore(self, executed_operations):
+        """Continue an execution that executed the operations before"""
+        self.executed_operations = executed_operations
+        # They were counted when that execution was reset
+        self.total_operations -= executed_operations
+
     def __iadd__(self, other):
         self.executed_operations += other
+
+
+class BatchOperationsCounter(OperationsCounter):
+    """Operations counter of a batch of lanes (one lane per sample)
+
+    `executed_operations` is an array with the count of every lane and
+    `active` is the mask of the lanes that the current instruction applies
+    to, narrowed by the batch control structures.
+    """
+
+    def __init__(self, lanes=1, limit=inf):
+        self.lanes = lanes
+        self.active = None
+        super(BatchOperationsCounter, self).__init__(limit)
+        self.executed_operations = zeros(lanes, dtype=int)
+        self.reset()
+
+    def allow_execution(self):
+        return bool(self.allowed_lanes().any())
+
+    def allowed_lanes(self):
+        return self.active & (self.executed_operations < self.limit)
+
+    def increment(self):
+        self.executed_operations += self.active
+
+    def reset(self):
+        self.total_operations += int(self.executed_operations.sum())
+        self.executed_operations = zeros(self.lanes, dtype=int)
+        self.active = ones(self.lanes, dtype=bool)
+
+    def restore(self, executed_operations):
+        self.executed_operations = executed_operations.copy()
+        self.total_operations -= int(executed_operations.sum())
+
+
+class StrategyCompiler:
+    INDENTATION = '    '
+
+    def __init__(self):
+        self.constants = []
+        self.lines = []
+        self._depth = 2
+
+    def build(self, strategy):
+        self.compile_strategy(strategy)
+        names = [self._name(i) for i in range(len(self.constants))]
+        source = "\n".join(
+            [
+                "def factory(" + ", ".join(names) + "):",
+                "    def compiled(operations_counter):",
+                "        increment = operations_counter.increment",
+                "        allow_execution = operations_counter.allow_execution"
+            ] +
+            self.lines +
+            ["    return compiled"]
+        )
+        factory = _compiled_factories.get(source)
+        if factory is None:
+            namespace = {}
+            exec(compile(source, '<compiled strategy>', 'exec'), namespace)
+            factory = _compiled_factories[source] = namespace['factory']
+        return factory(*self.constants)
+
+    def compile_strategy(self, strategy):
+        if not strategy.instructions:
+            self.emit("pass")
+        for instruction in strategy.instructions:
+            if isinstance(instruction, Strategy):
+                self.compile_strategy(instruction)
+            elif hasattr(instruction, 'compile'):
+                instruction.compile(self)
+            else:
+                self.emit(self.constant(instruction) + "(operations_counter)")
+
+    def condition(self, condition):
+        """Emit what precedes the condition and return its expression"""
+        if hasattr(condition, 'compile_expression'):
+            return condition.compile_expression(self)
+        return self.constant(condition) + "(operations_counter)"
+
+    def constant(self, value):
+        self.constants.append(value)
+        return self._name(len(self.constants) - 1)
+
+    def emit(self, line):
+        self.lines.append(self.INDENTATION * self._depth + line)
+
+    def indent(self):
+        self._depth += 1
+
+    def dedent(self):
+        self._depth -= 1
+
+    @staticmethod
+    def _name(index):
+        return "_" + str(index)
@@ -1,15 +1,31 @@
+from bisect import bisect_left
+from collections import OrderedDict
 from copy import copy
+from heapq import heapify, heappop, heappush, nsmallest
+from itertools import count
 
+from .compact_strategy import CompactStrategy, build_strategy
 from .helpers import CustomBaseNumber
 from .instructions import Action, Condition, ControlStructure
 from .strategy import Strategy
 
 
 class StrategyGeneratorAbstract:
+    # Whether `generate_indexed` yields indices in increasing order and
+    # supports ranges (which parallel fits and checkpoints rely on)
+    ENUMERATES_BY_INDEX = True
+    # Whether `report` should be called with the cost of every strategy
+    NEEDS_COSTS = False
+
     def __init__(self, actions, control_structures, conditions):
         self.actions = self._convert_instructions(actions, Action)
         self.control_structures = control_structures
         self.conditions = self._convert_instructions(conditions, Condition)
+        # Numbers of generated candidates that weren't valid strategies (or
+        # were redundant ones) and that were duplicates of yielded ones, so
+        # they weren't yielded
+        self.rejected = 0
+        self.duplicates = 0
 
     def _convert_instructions(self, instructions, instruction_class):
         return [
@@ -21,31 +37,231 @@ class StrategyGeneratorAbstract:
     def generate(self):
         raise NotImplementedError("Call to abstract method")
 
+    def parameters(self):
+        """Everything that determines the enumeration (e.g. for caching)"""
+        return {
+            'generator': self.__class__,
+            'actions': self.actions,
+            'control_structures': self.control_structures,
+            'conditions': self.conditions
+        }
+
+    def generate_indexed(self, start=0, stop=None):
+        raise NotImplementedError("Call to abstract method")
+
+    def size(self, max_length=None):
+        raise NotImplementedError("Call to abstract method")
+
+    def strategy_at(self, index):
+        raise NotImplementedError("Call to abstract method")
+
+    def index_of(self, strategy):
+        raise NotImplementedError("Call to abstract method")
+
+    def report(self, strategy, cost):
+        """Feedback about the last generated strategy, lower cost is better"""
+        pass
+
 
 class BruteForceGenerator(StrategyGeneratorAbstract):
-    END_OF_BODY = 0
+    """Enumerate all strategies up to `max_length` instructions
+
+    If `rules` (a `RuleSet`) are given, strategies with two adjacent actions
+    that the rules make redundant and strategies with an empty body of a
+    control structure that then does nothing are skipped (their indices are
+    left out as invalid ones).
 
-    def __init__(self, actions, control_structures, conditions, max_length):
+    If `compact` is True, `CompactStrategy` objects are generated instead
+    of strategies, which is faster when most candidates are rejected.
+
+    If `seen_size` is given, strategies with the same canonical key (see
+    `Strategy.canonical_key`) as one of the last `seen_size` strategies
+    yielded by the same call are skipped. Distinct digits only give the same
+    strategy if the generator has equal instructions (e.g. an action given
+    twice), because the last digit of an index is never an end of a body.
+    """
+    END_OF_BODY = CompactStrategy.END_OF_BODY
+
+    def __init__(
+            self,
+            actions,
+            control_structures,
+            conditions,
+            max_length,
+            rules=None,
+            compact=False,
+            seen_size=None
+    ):
         self._max_length = max_length
+        self.rules = rules
+        self.compact = compact
+        self.seen_size = seen_size
         self._instructions = []
+        self._depth_changes = []
+        self._canonical_digits = []
+        self._seen = OrderedDict()
+        self._redundant_pairs = set()
+        self._redundant_last = set()
         super(BruteForceGenerator, self).__init__(
             actions,
             control_structures,
             conditions
         )
 
-    def generate(self):
+    def parameters(self):
+        parameters = super(BruteForceGenerator, self).parameters()
+        parameters['max_length'] = self._max_length
+        parameters['rules'] = (
+            self.rules.facts if self.rules is not None else None
+        )
+        return parameters
+
+    def generate(self, start=0, stop=None):
+        for _, strategy in self.generate_indexed(start, stop):
+            yield strategy
+
+    def generate_indexed(self, start=0, stop=None):
+        """Yield `(index, strategy)` pairs for indices in [start, stop)"""
         if len(self.actions) < 1 and len(self.control_structures) < 1:
-            return []
+            return
 
-        self._prepare_instructions()
-        number = CustomBaseNumber(0, len(self._instructions))
-        while len(number) <= self._max_length:
+        size = self.size()
+        stop = size if stop is None else min(stop, size)
+        number = CustomBaseNumber(start, len(self._instructions))
+        self._seen.clear()
+        for index in range(start, stop):
             strategy = self._convert_to_strategy(number)
-            if isinstance(strategy, Strategy):
-                yield strategy
+            if strategy is False:
+                self.rejected += 1
+            elif not self.seen_size or not self._is_duplicate(number.digits):
+                yield index, strategy
             number.increment()
 
+    def generate_depth_first(self):
+        """Yield `(index, strategy, digits, ends)` in prefix order
+
+        Strategies are enumerated from the shortest ones, like by
+        `generate`, but strategies of one length are ordered by their first
+        instruction, then by the second one and so on, so consecutive ones
+        share as long a prefix of digits as possible. `ends` are the numbers
+        of digits that the top-level instructions end after.
+        """
+        self._prepare_instructions()
+        if len(self.actions) < 1 and len(self.control_structures) < 1:
+            return
+
+        base = len(self._instructions)
+        depth_changes = self._depth_changes
+        pairs = self._redundant_pairs
+        self._seen.clear()
+        yield 0, self._convert_digits_to_strategy(()), (), ()
+        for length in range(1, self._max_length + 1):
+            digits = [-1] * length
+            weights = [base ** position for position in range(length)]
+            # Number of bodies open before every position
+            depths = [0] * (length + 1)
+            position = 0
+            while position >= 0:
+                digit = digits[position] + 1
+                last = position == length - 1
+                previous = digits[position - 1] if position else None
+                while digit < base and (
+                        depths[position] + depth_changes[digit] < 0 or
+                        (previous, digit) in pairs or
+                        (last and (
+                            digit == self.END_OF_BODY or
+                            digit in self._redundant_last
+                        ))
+                ):
+                    digit += 1
+                if digit == base:
+                    digits[position] = -1
+                    position -= 1
+                    continue
+                digits[position] = digit
+                depths[position + 1] = depths[position] + depth_changes[digit]
+                if not last:
+                    position += 1
+                    continue
+                index = sum(
+                    digit * weight for digit, weight in zip(digits, weights)
+                )
+                ends = tuple(
+                    end for end in range(1, length + 1) if not depths[end]
+                )
+                if depths[length]:
+                    ends += (length,)
+                if self.seen_size and self._is_duplicate(digits):
+                    continue
+                yield (
+                    index,
+                    self._convert_digits_to_strategy(digits),
+                    tuple(digits),
+                    ends
+                )
+
+    def size(self, max_length=None):
+        """Number of indices (valid or not) in the enumeration
+
+        Strategies are enumerated from the shortest ones, so the strategies
+        of at most `max_length` instructions have indices below
+        `size(max_length)`.
+        """
+        self._prepare_instructions()
+        if max_length is None:
+            max_length = self._max_length
+        return len(self._instructions) ** max_length
+
+    def strategy_at(self, index):
+        """Build the strategy with the given index without enumerating"""
+        size = self.size()
+        if not 0 <= index < size:
+            raise IndexError(
+                "Index out of range of the enumeration of size " + str(size)
+            )
+        strategy = self._convert_to_strategy(
+            CustomBaseNumber(index, len(self._instructions))
+        )
+        if strategy is False:
+            raise ValueError(
+                "Index " + str(index) + " is not a valid strategy"
+            )
+        return strategy
+
+    def index_of(self, strategy):
+        """Inverse of `strategy_at`"""
+        self._prepare_instructions()
+        if isinstance(strategy, CompactStrategy):
+            digits = list(strategy.opcodes)
+        else:
+            digits = self._convert_to_digits(strategy, True)
+        if len(digits) > self._max_length:
+            raise ValueError("Strategy is longer than the maximum length")
+        return CustomBaseNumber.from_digits(
+            digits,
+            len(self._instructions)
+        ).to_decimal()
+
+    def _convert_to_digits(self, strategy, last):
+        digits = []
+        for i, instruction in enumerate(strategy.instructions):
+            digits.append(self._digit_of(instruction))
+            if isinstance(instruction, ControlStructure):
+                body_last = last and i == len(strategy.instructions) - 1
+                digits += self._convert_to_digits(instruction.body, body_last)
+                if not body_last:
+                    digits.append(self.END_OF_BODY)
+        return digits
+
+    def _digit_of(self, instruction):
+        digit = self._digits.get(_digit_key(instruction))
+        if digit is None:
+            raise ValueError(
+                "Instruction " + str(instruction) +
+                " is not known to the generator"
+            )
+        return digit
+
     def _prepare_instructions(self):
         self._instructions = [BruteForceGenerator.END_OF_BODY]
         self._instructions += self.actions
@@ -55,19 +271,390 @@ class BruteForceGenerator(StrategyGeneratorAbstract):
                     self._instructions.append(control_structure(condition))
             else:
                 self._instructions.append(control_structure())
+        self._depth_changes = [
+            -1 if digit == self.END_OF_BODY
+            else 1 if isinstance(instruction, ControlStructure)
+            else 0
+            for digit, instruction in enumerate(self._instructions)
+        ]
+        # Instructions are matched by their canonical keys, so that methods
+        # of different memory elements are told apart
+        self._digits = {}
+        for digit, instruction in enumerate(self._instructions):
+            if digit != self.END_OF_BODY:
+                self._digits.setdefault(_digit_key(instruction), digit)
+        self._prepare_canonical_digits()
+        self._prepare_redundant_digits()
+
+    def _prepare_canonical_digits(self):
+        """Map every digit to the first one of an equal instruction"""
+        self._canonical_digits = []
+        if not self.seen_size:
+            return
+        first_digits = {}
+        for digit, instruction in enumerate(self._instructions):
+            key = (
+                instruction if digit == self.END_OF_BODY
+                else instruction.canonical_key()
+            )
+            self._canonical_digits.append(first_digits.setdefault(key, digit))
+
+    def _is_duplicate(self, digits):
+        """Check if the strategy of the digits was yielded, remember it"""
+        canonical_digits = self._canonical_digits
+        key = tuple(canonical_digits[digit] for digit in digits)
+        seen = self._seen
+        if key in seen:
+            self.duplicates += 1
+            return True
+        seen[key] = None
+        if len(seen) > self.seen_size:
+            seen.popitem(last=False)
+        return False
+
+    def _prepare_redundant_digits(self):
+        self._redundant_pairs = set()
+        self._redundant_last = set()
+        if self.rules is None:
+            return
+        # Actions have digits from 1, right after END_OF_BODY
+        for first, second in self.rules.redundant_pairs(self.actions):
+            self._redundant_pairs.add((first + 1, second + 1))
+        for digit, instruction in enumerate(self._instructions):
+            if (
+                    isinstance(instruction, ControlStructure) and
+                    instruction.EMPTY_BODY_DOES_NOTHING
+            ):
+                self._redundant_pairs.add((digit, self.END_OF_BODY))
+                # The body of the last instruction is closed implicitly
+                self._redundant_last.add(digit)
+
+    def _is_redundant(self, digits):
+        pairs = self._redundant_pairs
+        for position in range(1, len(digits)):
+            if (digits[position - 1], digits[position]) in pairs:
+                return True
+        return bool(digits) and digits[-1] in self._redundant_last
 
     def _convert_to_strategy(self, number):
-        strategy = Strategy()
-        body_stack = [strategy]
-        for digit in number.digits:
-            instruction = copy(self._instructions[digit])
-            if instruction != self.END_OF_BODY:
-                body_stack[-1].append(instruction)
-            else:
+        return self._convert_digits_to_strategy(number.digits)
+
+    def _convert_digits_to_strategy(self, digits):
+        if self._redundant_pairs and self._is_redundant(digits):
+            return False
+        if not self.compact:
+            return build_strategy(digits, self._instructions)
+        depth = 0
+        depth_changes = self._depth_changes
+        for digit in digits:
+            depth += depth_changes[digit]
+            if depth < 0:
+                return False
+        return CompactStrategy(digits, self._instructions)
+
+
+class GrammarGenerator(BruteForceGenerator):
+    """Enumerate only well-formed strategies
+
+    Yields exactly the strategies of `BruteForceGenerator`, with the same
+    indices and in the same order (by size, then by index), but digit
+    sequences that close more bodies than they open are never built.
+    Strategies that only differ in their first instruction are built from
+    the same instructions after it, so strategies of one length can share
+    control structures (strategies aren't changed after generation).
+    """
+
+    def generate_indexed(self, start=0, stop=None):
+        if len(self.actions) < 1 and len(self.control_structures) < 1:
+            return
+
+        size = self.size()
+        stop = size if stop is None else min(stop, size)
+        base = len(self._instructions)
+        # Numbers of bodies that the digits close
+        closed_bodies = [-change for change in self._depth_changes]
+        self._seen.clear()
+        for length in range(self._max_length + 1):
+            low = base ** (length - 1) if length else 0
+            if base ** length <= start:
+                continue
+            if low >= stop:
+                return
+            if not length:
+                yield 0, self._convert_digits_to_strategy(())
+                continue
+            odometer = _WellFormedOdometer(closed_bodies, length)
+            if not odometer.seek(max(start, low)):
+                continue
+            # The first digit changes the fastest, so it's enumerated here
+            # and the odometer only carries into the higher positions
+            digits = odometer.digits
+            while True:
+                high = odometer.value - digits[0]
+                options = odometer.allowed[0][odometer.required[1]]
+                build = (
+                    self._convert_digits_to_strategy if self.compact
+                    else self._prepend(digits)
+                )
+                for digit in options[odometer.choices[0]:]:
+                    if high + digit >= stop:
+                        return
+                    digits[0] = digit
+                    strategy = build(digits)
+                    if strategy is False:
+                        self.rejected += 1
+                    elif (
+                            not self.seen_size or
+                            not self._is_duplicate(digits)
+                    ):
+                        yield high + digit, strategy
+                odometer.value = high + digits[0]
+                if not odometer.carry(1):
+                    break
+
+    def _prepend(self, digits):
+        """Builder of strategies of the digits that only differ in the first
+
+        The instructions after the first one are built once, split by the
+        end of the body that the first instruction opens.
+        """
+        segments = [[]]
+        body_stack = [segments[0]]
+        for digit in digits[1:]:
+            if digit == self.END_OF_BODY:
                 body_stack.pop()
                 if not body_stack:
-                    return False
+                    segments.append([])
+                    body_stack.append(segments[-1])
+                continue
+            instruction = self._instructions[digit]
             if isinstance(instruction, ControlStructure):
+                instruction = copy(instruction)
                 instruction.body = Strategy()
-                body_stack.append(instruction.body)
-        return strategy
+                body_stack[-1].append(instruction)
+                body_stack.append(instruction.body.instructions)
+            else:
+                body_stack[-1].append(instruction)
+        body = segments[0]
+        rest = segments[1] if len(segments) > 1 else []
+        pairs = self._redundant_pairs
+        second = digits[1] if len(digits) > 1 else None
+        rest_redundant = bool(pairs) and self._is_redundant(digits[1:])
+
+        def build(digits):
+            digit = digits[0]
+            if pairs and (
+                    rest_redundant or (digit, second) in pairs or
+                    (second is None and digit in self._redundant_last)
+            ):
+                return False
+            instruction = self._instructions[digit]
+            if isinstance(instruction, ControlStructure):
+                instruction = copy(instruction)
+                instruction.body = Strategy(list(body))
+                return Strategy([instruction] + rest)
+            return Strategy([instruction] + body)
+        return build
+
+
+class _WellFormedOdometer:
+    """Digits of one length that never close a body that wasn't opened
+
+    Position 0 is the least significant digit and the first instruction.
+    `required[p]` is the number of bodies that digits below `p` have to leave
+    open for the digits from `p` up to be well-formed, so each position only
+    ever takes digits from a precomputed list of allowed ones.
+    """
+
+    def __init__(self, depth_changes, length):
+        base = len(depth_changes)
+        can_open_body = -1 in depth_changes
+        self.length = length
+        self.weights = [base ** position for position in range(length)]
+        self.allowed = []
+        for position in range(length):
+            reachable = position if can_open_body else 0
+            first = 1 if position == length - 1 else 0
+            self.allowed.append([
+                [
+                    digit for digit in range(first, base)
+                    if max(0, required + depth_changes[digit]) <= reachable
+                ]
+                for required in range(length + 1)
+            ])
+        self.depth_changes = depth_changes
+        self.digits = [0] * length
+        self.choices = [0] * length
+        self.required = [0] * (length + 1)
+        self.value = 0
+
+    def seek(self, index):
+        """Move to the first well-formed number not lower than index"""
+        target = [0] * self.length
+        for position in range(self.length):
+            target[position] = index // self.weights[position] % (
+                len(self.depth_changes)
+            )
+        self.value = 0
+        bounded = True
+        for position in reversed(range(self.length)):
+            options = self._options(position)
+            choice = bisect_left(options, target[position]) if bounded else 0
+            if choice == len(options):
+                return self.carry(position + 1)
+            self._choose(position, choice)
+            bounded = bounded and options[choice] == target[position]
+        return True
+
+    def carry(self, position):
+        for position in range(position, self.length):
+            if self.choices[position] + 1 < len(self._options(position)):
+                self._choose(position, self.choices[position] + 1)
+                self._reset_below(position)
+                return True
+        return False
+
+    def _reset_below(self, position):
+        for position in reversed(range(position)):
+            self._choose(position, 0)
+
+    def _options(self, position):
+        return self.allowed[position][self.required[position + 1]]
+
+    def _choose(self, position, choice):
+        digit = self._options(position)[choice]
+        self.value += (digit - self.digits[position]) * self.weights[position]
+        self.digits[position] = digit
+        self.choices[position] = choice
+        self.required[position] = max(
+            0,
+            self.required[position + 1] + self.depth_changes[digit]
+        )
+
+
+class BestFirstGenerator(BruteForceGenerator):
+    """Enumerate strategies by extending the most promising ones first
+
+    Strategies are built by appending one instruction at a time (or ending
+    a body) to a strategy that was already generated, starting from the one
+    with the lowest cost reported by `report` (`SupervisedLearning` reports
+    the mean distance of the outputs from the expected ones). Strategies
+    that weren't reported inherit the cost of the strategy they extend.
+    Indices are the ones of `BruteForceGenerator`.
+
+    At most about `queue_size` strategies wait to be extended, the worst
+    ones are dropped, so the search isn't exhaustive unless the queue is
+    large enough.
+    """
+    ENUMERATES_BY_INDEX = False
+    NEEDS_COSTS = True
+
+    def __init__(
+            self,
+            actions,
+            control_structures,
+            conditions,
+            max_length,
+            queue_size=10000,
+            rules=None,
+            compact=False,
+            seen_size=None
+    ):
+        self.queue_size = queue_size
+        self._reported_cost = None
+        self._generated = None
+        super(BestFirstGenerator, self).__init__(
+            actions,
+            control_structures,
+            conditions,
+            max_length,
+            rules,
+            compact,
+            seen_size
+        )
+
+    def parameters(self):
+        parameters = super(BestFirstGenerator, self).parameters()
+        parameters['queue_size'] = self.queue_size
+        return parameters
+
+    def generate_indexed(self, start=0, stop=None):
+        if start or stop is not None:
+            raise ValueError(
+                "BestFirstGenerator doesn't enumerate ranges of indices"
+            )
+        if len(self.actions) < 1 and len(self.control_structures) < 1:
+            return
+
+        self._prepare_instructions()
+        base = len(self._instructions)
+        depth_changes = [
+            1 if digit == self.END_OF_BODY
+            else -1 if isinstance(instruction, ControlStructure)
+            else 0
+            for digit, instruction in enumerate(self._instructions)
+        ]
+        self._seen.clear()
+        root = self._generated = self._convert_digits_to_strategy(())
+        self._reported_cost = None
+        yield 0, root
+        if self._max_length < 1:
+            return
+        order = count()
+        cost = self._cost_of(root, 0)
+        # Entries: cost, length, tie breaker, digits, index, open bodies
+        queue = [(cost, 0, next(order), (), 0, 0)]
+        while queue:
+            cost, length, _, digits, index, depth = heappop(queue)
+            weight = base ** length
+            for digit in range(base):
+                child_depth = depth - depth_changes[digit]
+                if child_depth < 0:
+                    continue
+                child = digits + (digit,)
+                if length and (digits[-1], digit) in self._redundant_pairs:
+                    continue
+                child_index = index + digit * weight
+                child_cost = cost
+                # A strategy that ends with the end of a body or with an
+                # empty body that does nothing is the same as a shorter one
+                if (
+                        digit != self.END_OF_BODY and
+                        digit not in self._redundant_last
+                ):
+                    # Extensions of a duplicate are duplicates too
+                    if self.seen_size and self._is_duplicate(child):
+                        continue
+                    strategy = self._convert_digits_to_strategy(child)
+                    self._generated = strategy
+                    self._reported_cost = None
+                    yield child_index, strategy
+                    child_cost = self._cost_of(strategy, cost)
+                if length + 1 < self._max_length:
+                    heappush(queue, (
+                        child_cost,
+                        length + 1,
+                        next(order),
+                        child,
+                        child_index,
+                        child_depth
+                    ))
+            if len(queue) > 2 * self.queue_size:
+                queue = nsmallest(self.queue_size, queue)
+                heapify(queue)
+
+    def report(self, strategy, cost):
+        if strategy is self._generated:
+            self._reported_cost = cost
+
+    def _cost_of(self, strategy, default):
+        if strategy is not self._generated or self._reported_cost is None:
+            return default
+        return self._reported_cost
+
+
+def _digit_key(instruction):
+    if isinstance(instruction, ControlStructure):
+        # The body of a control structure isn't part of its digit
+        return instruction.canonical_key()[:2]
+    return instruction.canonical_key()
@@ -1,9 +1,33 @@
+from contextlib import contextmanager
 from copy import deepcopy
+from itertools import islice
+from json import loads
+from multiprocessing import get_context
+from time import monotonic
 
-from .helpers import EventDispatcher, same
-from .strategy import OperationsCounter
+from numpy import count_nonzero, zeros
+
+from .cache import cache_key
+from .helpers import (
+    EventDispatcher,
+    comparator_for,
+    read_json,
+    same,
+    write_json
+)
+from .pruning import EquivalencePruner
+from .search_stats import SearchStats
+from .strategy import BatchOperationsCounter, OperationsCounter
 from .strategy_generators import BruteForceGenerator
 
+# State inherited by forked worker processes of a parallel fit
+_worker_state = None
+
+
+def _search_range(bounds):
+    supervised_learning, data = _worker_state
+    return supervised_learning._search_range(data, *bounds)
+
 
 class SupervisedLearning(EventDispatcher):
     def __init__(
@@ -16,7 +40,24 @@ class SupervisedLearning(EventDispatcher):
             brute_force_generator_max_length=5,
             accepted_score=1,
             operations_counter=None,
-            max_operations=100
+            max_operations=100,
+            parallel=None,
+            parallel_chunk_size=None,
+            prune_equivalent=False,
+            prune_redundant=False,
+            compile_strategies=False,
+            compact_strategies=False,
+            seen_size=None,
+            early_exit=False,
+            incremental=False,
+            comparator=None,
+            cache=None,
+            checkpoint_path=None,
+            checkpoint_interval=5,
+            time_limit=None,
+            max_candidates=None,
+            progress_interval=1,
+            profiler=None
     ):
         self.memory = memory
         self.preprocess_input = preprocess_input
@@ -26,31 +67,727 @@ class SupervisedLearning(EventDispatcher):
             memory.actions,
             memory.control_structures,
             memory.conditions,
-            brute_force_generator_max_length
+            brute_force_generator_max_length,
+            memory.rules if prune_redundant else None,
+            compact_strategies,
+            seen_size
         )
         self.accepted_score = accepted_score
         self.best_strategy = None
         self.best_score = 0
-        self.operations_counter = operations_counter or OperationsCounter(
-            max_operations
+        self.operations_counter = operations_counter or (
+            BatchOperationsCounter(limit=max_operations) if memory.BATCHED
+            else OperationsCounter(max_operations)
         )
+        self.parallel = parallel
+        self.parallel_chunk_size = parallel_chunk_size
+        self.prune_equivalent = prune_equivalent
+        self.compile_strategies = compile_strategies
+        self.early_exit = early_exit
+        self.incremental = incremental
+        self.comparator = comparator
+        self.cache = cache
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+        self.time_limit = time_limit
+        self.max_candidates = max_candidates
+        self.progress_interval = progress_interval
+        self.profiler = profiler
+        self.search_stats = None
+        self._checkpoint_key = None
+        self._checkpoint_time = 0
+        self._progress_time = 0
+        self._best_index = None
+        self._sample_order = []
+        self._sample_rejections = []
+        self._prepared_states = None
+        self._expected_outputs = None
+        # Whether the last score is only an upper bound (see
+        # `_score_until_rejected`)
+        self._score_bounded = False
+        # State of the memory at the start of the last fit, which every
+        # execution starts from
+        self._start_state = None
         super(SupervisedLearning, self).__init__()
 
-    def fit(self, data):
+    def fit(self, data, resume_from=None):
+        """Search for the best strategy for the data
+
+        If `checkpoint_path` is set, the position of the search and the best
+        strategy found so far are saved there every `checkpoint_interval`
+        seconds. Passing such a file as `resume_from` continues the search
+        where it stopped (the data and the search parameters must be the same
+        as when the checkpoint was written).
+
+        Strategies are scored from the shortest ones, so with a `time_limit`
+        (in seconds) or `max_candidates` the search is anytime: it stops when
+        the budget runs out and `best_strategy` is the best one found so far.
+        Returns `SearchStats` of the search.
+
+        The 'new_best' event is dispatched when a better strategy is found
+        and the 'progress' event (with `search_stats`, which is updated as
+        the search runs) every `progress_interval` seconds, if there are
+        listeners of it. With a `Profiler`, the fit is profiled.
+        """
+        with self._profiling():
+            return self._fit(data, resume_from)
+
+    def _fit(self, data, resume_from):
+        self._keep_start_state()
         preprocessed_data = self._preprocess(data)
-        strategies = self.strategy_generator.generate()
-        for strategy in strategies:
-            correct = 0
-            for sample in preprocessed_data:
-                input_ = deepcopy(sample.input)
-                prediction = self.predict(input_, strategy, False)
-                correct += int(same(prediction, sample.output))
-            score = correct / len(data)
+        start = 0
+        if self.checkpoint_path is not None or resume_from is not None:
+            self._checkpoint_key = cache_key(self, preprocessed_data)
+            if self._checkpoint_key is None:
+                raise ValueError(
+                    "Checkpoints need instructions and data that can be "
+                    "hashed stably"
+                )
+        if resume_from is not None:
+            start = self._resume(resume_from)
+        key = None
+        if self.cache is not None:
+            key = self._checkpoint_key or cache_key(self, preprocessed_data)
+        if key is None:
+            # Without a stable key, a cached result could be another fit's
+            self._search(preprocessed_data, start)
+            return self.search_stats
+
+        record = self.cache.lookup(key)
+        if record is not None:
+            self._best_index = record['index']
+            self.best_strategy = self.strategy_generator.strategy_at(
+                self._best_index
+            )
+            self.best_score = record['score']
+            self.search_stats = SearchStats(self.strategy_generator)
+            self.search_stats.stop('cached', 0)
+            return self.search_stats
+
+        self._search(preprocessed_data, start)
+        complete = self.search_stats.stop_reason in ('accepted', 'exhausted')
+        if complete and self._best_index is not None:
+            self.cache.store(
+                key,
+                {'index': self._best_index, 'score': self.best_score}
+            )
+        return self.search_stats
+
+    def fit_stream(self, samples, active_size=8, max_active_size=64):
+        """Search for the best strategy for samples that aren't all in memory
+
+        `samples` is an iterable of `DataSample`s that can be iterated
+        repeatedly (e.g. a list) or a function that returns a new iterator of
+        them (e.g. `lambda: DataSample.from_jsonl(path)`). Candidates are
+        scored on the first `active_size` samples only and an accepted one is
+        then checked against all samples, one at a time. The first sample
+        that it gets wrong (a counterexample) becomes active, replacing the
+        active sample that rejected the fewest candidates if there are
+        `max_active_size` of them, and the search continues after the
+        rejected candidate. So memory use doesn't grow with the number of
+        samples.
+
+        Every active sample is one of the samples, so with `accepted_score`
+        1 the accepted strategy is the one that `fit` would find. With a
+        lower one, a skipped candidate could have reached it on all samples.
+        `best_score` of an accepted strategy is its score on all samples,
+        otherwise the one on the active samples. Returns `SearchStats` of all
+        rounds of the search. Checkpoints aren't supported and results
+        aren't cached.
+        """
+        with self._profiling():
+            return self._fit_stream(samples, active_size, max_active_size)
+
+    def _fit_stream(self, samples, active_size, max_active_size):
+        if self.checkpoint_path is not None:
+            raise ValueError("Streaming fits don't support checkpoints")
+        self._keep_start_state()
+        if callable(samples):
+            open_samples = samples
+        elif iter(samples) is samples:
+            raise ValueError(
+                "Streaming fits iterate samples repeatedly, so they need a "
+                "function that returns an iterator of them, not an iterator"
+            )
+        else:
+            def open_samples():
+                return iter(samples)
+
+        active = [
+            self._preprocess_sample(sample)
+            for sample in islice(open_samples(), active_size)
+        ]
+        if not active:
+            raise ValueError("There are no samples")
+        positions = list(range(len(active)))
+        resumable = (
+            self.strategy_generator.ENUMERATES_BY_INDEX and
+            not self.incremental
+        )
+        start = 0
+        search_stats = None
+        while True:
+            self.best_strategy = None
+            self.best_score = 0
+            self._best_index = None
+            self._search(active, start, search_stats)
+            search_stats = self.search_stats
+            if search_stats.stop_reason != 'accepted':
+                return search_stats
+
+            score, counterexample = self._verify(
+                self.best_strategy,
+                open_samples,
+                positions
+            )
+            if score >= self.accepted_score:
+                self.best_score = score
+                search_stats.record_best(self._best_index, score)
+                return search_stats
+
+            search_stats.counterexamples += 1
+            position, sample = counterexample
+            if len(active) < max_active_size:
+                active.append(sample)
+                positions.append(position)
+            else:
+                replaced = min(
+                    range(len(active)),
+                    key=self._sample_rejections.__getitem__
+                )
+                active[replaced] = sample
+                positions[replaced] = position
+            start = self._best_index + 1 if resumable else 0
+
+    def _keep_start_state(self):
+        """Snapshot the memory as it was set up for the fit, if supported
+
+        Executions of the fit and later predictions start from it, so that
+        they don't depend on what was executed before (e.g. where the
+        pointer of a tape was left).
+        """
+        try:
+            self._start_state = self.memory.snapshot()
+        except NotImplementedError:
+            self._start_state = None
+
+    @contextmanager
+    def _profiling(self):
+        if self.profiler is None:
+            yield
+            return
+        with self.profiler.attached(self):
+            yield
+
+    def _verify(self, strategy, open_samples, active_positions):
+        """Score of the strategy on all samples and a counterexample
+
+        The counterexample is the position and the preprocessed sample of
+        the first inactive sample that the strategy gets wrong (or None).
+        With `accepted_score` 1, samples after it aren't scored.
+        """
+        correct = 0
+        count = 0
+        counterexample = None
+        for position, sample in enumerate(open_samples()):
+            sample = self._preprocess_sample(sample)
+            output = self.predict(sample.input, strategy, process=False)
+            count += 1
+            if sample.comparator(output, sample.output):
+                correct += 1
+            elif counterexample is None and position not in active_positions:
+                counterexample = (position, sample)
+                if self.accepted_score >= 1:
+                    break
+        if not count:
+            raise ValueError(
+                "The samples couldn't be iterated again, the function has to "
+                "return a new iterator of them on every call"
+            )
+        return correct / count, counterexample
+
+    def _search(self, preprocessed_data, start=0, search_stats=None):
+        if not self.strategy_generator.ENUMERATES_BY_INDEX and (
+            start or self.parallel or self.checkpoint_path is not None
+        ):
+            raise ValueError(
+                "Parallel fits and checkpoints need a strategy generator "
+                "that enumerates strategies by index"
+            )
+        if self.parallel and self.prune_equivalent:
+            # Workers would only prune within their own ranges
+            raise ValueError(
+                "Parallel fits don't support pruning of equivalent strategies"
+            )
+        generator = self.strategy_generator
+        if self.incremental and (
+            start or self.parallel or self.checkpoint_path is not None or
+            self.prune_equivalent or
+            not hasattr(generator, 'generate_depth_first') or
+            not generator.ENUMERATES_BY_INDEX or generator.NEEDS_COSTS
+        ):
+            raise ValueError(
+                "Incremental fits need a generator with generate_depth_first "
+                "that enumerates strategies by index without costs and don't "
+                "support parallel fits, checkpoints and pruning of "
+                "equivalent strategies"
+            )
+        self._sample_order = list(range(len(preprocessed_data)))
+        self._prepared_states = self._prepare_states(preprocessed_data)
+        self._expected_outputs = self._prepare_expected_outputs(
+            preprocessed_data
+        )
+        # Rejections are counted for all lanes at once if outputs are
+        # matched by the memory
+        self._sample_rejections = (
+            [0] * len(preprocessed_data) if self._expected_outputs is None
+            else zeros(len(preprocessed_data), dtype=int)
+        )
+        self._checkpoint_time = monotonic()
+        self._progress_time = monotonic()
+        if search_stats is None:
+            search_stats = SearchStats(
+                self.strategy_generator,
+                self.operations_counter
+            )
+        else:
+            search_stats.resume()
+        self.search_stats = search_stats
+        self.search_stats.sample_rejections = self._sample_rejections
+        if self.best_score >= self.accepted_score:
+            position, reason = start, 'accepted'
+        elif self._budget_exhausted() is not None:
+            position, reason = start, self._budget_exhausted()
+        elif self.parallel:
+            position, reason = self._fit_parallel(preprocessed_data, start)
+        elif self.incremental:
+            position, reason = self._search_incremental(preprocessed_data)
+        else:
+            position, reason = self._search_sequential(
+                preprocessed_data,
+                start
+            )
+        if self.checkpoint_path is not None:
+            self._save_checkpoint(position)
+        # Counts the operations of the last execution
+        self.operations_counter.reset()
+        self.search_stats.stop(reason, position)
+
+    def _search_sequential(self, preprocessed_data, start):
+        """Score strategies in order, return where and why it stopped"""
+        pruner = EquivalencePruner() if self.prune_equivalent else None
+        generator = self.strategy_generator
+        progress = self.has_listeners('progress')
+        for index, strategy in generator.generate_indexed(start):
+            reason = self._budget_exhausted()
+            if reason is not None:
+                return index, reason
+            if self._checkpoint_due():
+                self._save_checkpoint(index)
+            if progress:
+                self._report_progress()
+            fingerprints = None
+            if pruner is not None:
+                key = pruner.check(strategy)
+                if key is None:
+                    self.search_stats.pruned += 1
+                    continue
+                fingerprints = []
+            distances = [] if generator.NEEDS_COSTS else None
+            score = self._score(
+                strategy,
+                preprocessed_data,
+                fingerprints,
+                distances
+            )
+            if pruner is not None:
+                pruner.record(key, fingerprints)
+            if distances is not None:
+                generator.report(strategy, sum(distances) / len(distances))
+            # Upper bounds aren't best scores of lengths
+            self.search_stats.record(
+                index,
+                None if self._score_bounded else score
+            )
+            if score > self.best_score:
+                self._improve(strategy, score, index)
+                if self.best_score >= self.accepted_score:
+                    return index + 1, 'accepted'
+        return self.strategy_generator.size(), 'exhausted'
+
+    def _search_incremental(self, data):
+        """Score strategies in prefix order, executing only what's new
+
+        The states of the memory and of the operations counter after every
+        complete top-level prefix of the last strategy are kept in a stack,
+        so a strategy only executes its last top-level instruction (which
+        may have an open body) from the state after the others. Entries of
+        prefixes that the next strategy doesn't share are dropped, so there
+        are never more of them than instructions in a strategy.
+
+        Strategies of one length are scored in a different order than by
+        `_search_sequential`, so the accepted one may be another one of the
+        same length. The 'pre_strategy_execution' event is dispatched once
+        per sample (with no strategy), before all strategies.
+        """
+        if self._prepared_states is None:
+            raise ValueError("Incremental fits need a memory with snapshots")
+        generator = self.strategy_generator
+        stack = [(0, self._root_states(data))]
+        previous_digits = ()
+        progress = self.has_listeners('progress')
+        for index, strategy, digits, ends in generator.generate_depth_first():
+            length_start = generator.size(len(digits) - 1) if digits else 0
+            reason = self._budget_exhausted()
+            if reason is not None:
+                return length_start, reason
+            if progress:
+                self._report_progress()
+            shared = 0
+            for digit, previous_digit in zip(digits, previous_digits):
+                if digit != previous_digit:
+                    break
+                shared += 1
+            previous_digits = digits
+            while stack[-1][0] > shared:
+                stack.pop()
+            instructions = strategy.instructions
+            while len(stack) < len(instructions):
+                count = len(stack)
+                stack.append((
+                    ends[count - 1],
+                    self._execute_from(stack[-1][1], instructions[count - 1])
+                ))
+
+            score = self._score_from(stack[-1][1], instructions[-1:], data)
+            self.search_stats.record(index, score)
+            if score > self.best_score:
+                self._improve(strategy, score, index)
+                if self.best_score >= self.accepted_score:
+                    return length_start, 'accepted'
+        return generator.size(), 'exhausted'
+
+    def _root_states(self, data):
+        """States of every unit (a sample or a batch) before any strategy"""
+        batches = (
+            [data] if self.memory.BATCHED
+            else [[sample] for sample in data]
+        )
+        states = []
+        for prepared_state, batch in zip(self._prepared_states, batches):
+            self._reset_operations_counter(batch)
+            self.memory.restore(prepared_state)
+            inputs = [deepcopy(sample.input) for sample in batch]
+            input_ = inputs if self.memory.BATCHED else inputs[0]
+            self.dispatch_event('pre_strategy_execution', {
+                'supervised_learning': self,
+                'strategy': None,
+                'input': input_,
+                'preprocessed_input': input_
+            })
+            states.append(self._execution_state(batch))
+        return states
+
+    def _execution_state(self, batch):
+        executed_operations = self.operations_counter.executed_operations
+        return (
+            batch,
+            self.memory.snapshot(),
+            executed_operations.copy() if self.memory.BATCHED
+            else executed_operations
+        )
+
+    def _restore_execution_state(self, state):
+        batch, snapshot, executed_operations = state
+        self._reset_operations_counter(batch)
+        self.memory.restore(snapshot)
+        self.operations_counter.restore(executed_operations)
+        return batch
+
+    def _execute_from(self, states, instruction):
+        new_states = []
+        for state in states:
+            batch = self._restore_execution_state(state)
+            instruction(self.operations_counter)
+            new_states.append(self._execution_state(batch))
+        return new_states
+
+    def _score_from(self, states, instructions, data):
+        correct = 0
+        # States are in the order of the samples
+        sample_index = 0
+        for state in states:
+            batch = self._restore_execution_state(state)
+            for instruction in instructions:
+                instruction(self.operations_counter)
+            outputs = self.memory.output()
+            if not self.memory.BATCHED:
+                outputs = [outputs]
+            for output, sample in zip(outputs, batch):
+                if sample.comparator(output, sample.output):
+                    correct += 1
+                else:
+                    self._sample_rejections[sample_index] += 1
+                sample_index += 1
+        return correct / len(data)
+
+    def _budget_exhausted(self):
+        """Reason to stop the search early or None"""
+        if (
+                self.max_candidates is not None and
+                self.search_stats.candidates >= self.max_candidates
+        ):
+            return 'max_candidates'
+        if (
+                self.time_limit is not None and
+                self.search_stats.running_time() >= self.time_limit
+        ):
+            return 'time_limit'
+        return None
+
+    def _improve(self, strategy, score, index):
+        self.best_strategy = strategy
+        self.best_score = score
+        self._best_index = index
+        self.search_stats.record_best(index, score)
+        self.dispatch_event('new_best', {
+            'supervised_learning': self,
+            'strategy': strategy,
+            'score': score,
+            'index': index
+        })
+
+    def _report_progress(self):
+        """Dispatch 'progress' if `progress_interval` seconds passed"""
+        now = monotonic()
+        if now - self._progress_time < self.progress_interval:
+            return
+        self._progress_time = now
+        self.dispatch_event('progress', {
+            'supervised_learning': self,
+            'search_stats': self.search_stats
+        })
+
+    def _checkpoint_due(self):
+        if self.checkpoint_path is None:
+            return False
+        return monotonic() - self._checkpoint_time >= self.checkpoint_interval
+
+    def _save_checkpoint(self, position):
+        """Record that every candidate before `position` has been scored"""
+        write_json(
+            self.checkpoint_path,
+            {
+                'key': self._checkpoint_key,
+                'position': position,
+                'best_index': self._best_index,
+                'best_score': self.best_score
+            }
+        )
+        self._checkpoint_time = monotonic()
+
+    def _resume(self, path):
+        checkpoint = read_json(path)
+        if checkpoint is None:
+            raise ValueError('No checkpoint in {}'.format(path))
+        if checkpoint.get('key') != self._checkpoint_key:
+            raise ValueError(
+                'The checkpoint in {} was written for different data or '
+                'search parameters'.format(path)
+            )
+        self._best_index = checkpoint['best_index']
+        self.best_score = checkpoint['best_score']
+        self.best_strategy = None if self._best_index is None \
+            else self.strategy_generator.strategy_at(self._best_index)
+        return checkpoint['position']
+
+    def _fit_parallel(self, data, start=0):
+        """Score disjoint index ranges of the generator in worker processes
+
+        Ranges are consumed in index order, so the accepted strategy is the
+        same one a sequential fit would find. Workers are forked, so each of
+        them holds its own copy of the memory (this requires a platform that
+        supports the "fork" start method). Budgets are checked between
+        ranges, so the search may overrun them by a range per worker.
+        """
+        global _worker_state
+
+        size = self.strategy_generator.size()
+        chunk_size = self.parallel_chunk_size or max(
+            1,
+            size // (self.parallel * 8)
+        )
+
+        _worker_state = (self, data)
+        try:
+            with get_context('fork').Pool(self.parallel) as pool:
+                ranges = self._parallel_ranges(start, chunk_size)
+                results = pool.imap(_search_range, ranges)
+                for (range_start, stop), result in zip(ranges, results):
+                    index, score, counts = result
+                    self.search_stats.record_range(
+                        range_start,
+                        best_score=score if index is not None else None,
+                        **counts
+                    )
+                    if index is not None and score > self.best_score:
+                        self._improve(
+                            self.strategy_generator.strategy_at(index),
+                            score,
+                            index
+                        )
+                        if self.best_score >= self.accepted_score:
+                            return index + 1, 'accepted'
+                    reason = self._budget_exhausted()
+                    if reason is not None:
+                        return stop, reason
+                    if self._checkpoint_due():
+                        self._save_checkpoint(stop)
+                    if self.has_listeners('progress'):
+                        self._report_progress()
+        finally:
+            _worker_state = None
+        return size, 'exhausted'
+
+    def _parallel_ranges(self, start, chunk_size):
+        """Chunks of the indices from `start` that don't mix lengths"""
+        ranges = []
+        size = self.strategy_generator.size()
+        length = 0
+        while start < size:
+            length_stop = self.strategy_generator.size(length)
+            length += 1
+            for chunk_start in range(start, length_stop, chunk_size):
+                ranges.append(
+                    (chunk_start, min(chunk_start + chunk_size, length_stop))
+                )
+            start = max(start, length_stop)
+        return ranges
+
+    def _search_range(self, data, start, stop):
+        # Runs in a forked worker, so the best strategy found so far is only
+        # tracked in the worker's own copy of self and counts are returned
+        # as differences of the worker's counters
+        best_index = None
+        candidates = 0
+        rejected = self.strategy_generator.rejected
+        duplicates = self.strategy_generator.duplicates
+        operations = self.operations_counter.total_operations
+        sample_rejections = list(self._sample_rejections)
+        strategies = self.strategy_generator.generate_indexed(start, stop)
+        for index, strategy in strategies:
+            score = self._score(strategy, data)
+            candidates += 1
             if score > self.best_score:
-                self.best_strategy = strategy
+                best_index = index
                 self.best_score = score
                 if self.best_score >= self.accepted_score:
-                    return
+                    break
+        self.operations_counter.reset()
+        counts = {
+            'candidates': candidates,
+            'rejected': self.strategy_generator.rejected - rejected,
+            'duplicates': self.strategy_generator.duplicates - duplicates,
+            'operations': (
+                self.operations_counter.total_operations - operations
+            ),
+            'sample_rejections': [
+                count - previous for count, previous in
+                zip(self._sample_rejections, sample_rejections)
+            ]
+        }
+        return best_index, self.best_score, counts
+
+    def _score(self, strategy, data, fingerprints=None, distances=None):
+        """Fraction of samples that the strategy gets right
+
+        Memory fingerprints and distances of outputs from the expected ones
+        are appended to the given lists, one per sample.
+        """
+        self._score_bounded = False
+        if self.memory.BATCHED:
+            return self._score_batch(strategy, data, fingerprints, distances)
+        if self.early_exit and fingerprints is None and distances is None:
+            return self._score_until_rejected(strategy, data)
+
+        correct = 0
+        for sample_index, sample in enumerate(data):
+            self._execute_sample(strategy, data, sample_index)
+            if fingerprints is not None:
+                fingerprints.append(self.memory.fingerprint())
+            output = self.memory.output()
+            if distances is not None:
+                distances.append(self.memory.distance(output, sample.output))
+            if sample.comparator(output, sample.output):
+                correct += 1
+            else:
+                self._sample_rejections[sample_index] += 1
+        return correct / len(data)
+
+    def _score_batch(self, strategy, data, fingerprints=None, distances=None):
+        """Score all samples with one execution of a batched memory"""
+        if self._prepared_states is None:
+            inputs = [deepcopy(sample.input) for sample in data]
+            self._execute(strategy, inputs, inputs)
+        else:
+            self._reset_operations_counter(data)
+            self.memory.restore(self._prepared_states[0])
+            inputs = self._listener_input([sample.input for sample in data])
+            self._execute_prepared(strategy, inputs, inputs)
+        if fingerprints is not None:
+            fingerprints.append(self.memory.fingerprint())
+        if distances is None and self._expected_outputs is not None:
+            matches = self.memory.matches(self._expected_outputs)
+            self._sample_rejections += ~matches
+            return count_nonzero(matches) / len(data)
+
+        correct = 0
+        outputs = self.memory.output()
+        for sample_index, (output, sample) in enumerate(zip(outputs, data)):
+            if distances is not None:
+                distances.append(self.memory.distance(output, sample.output))
+            if sample.comparator(output, sample.output):
+                correct += 1
+            else:
+                self._sample_rejections[sample_index] += 1
+        return correct / len(data)
+
+    def _score_until_rejected(self, strategy, data):
+        """Score samples until the strategy can't beat the best score
+
+        The returned value is then only an upper bound of the score, but it
+        isn't higher than the best score, so it doesn't matter. The samples
+        that rejected the most strategies so far are tried first.
+        """
+        correct = 0
+        remaining = len(data)
+        for position, sample_index in enumerate(self._sample_order):
+            self._execute_sample(strategy, data, sample_index)
+            remaining -= 1
+            sample = data[sample_index]
+            if sample.comparator(self.memory.output(), sample.output):
+                correct += 1
+                continue
+            self._reject_by_sample(position)
+            upper_bound = (correct + remaining) / len(data)
+            if upper_bound <= self.best_score:
+                self._score_bounded = True
+                return upper_bound
+        return correct / len(data)
+
+    def _reject_by_sample(self, position):
+        order = self._sample_order
+        rejections = self._sample_rejections
+        rejections[order[position]] += 1
+        while (
+                position > 0 and
+                rejections[order[position]] > rejections[order[position - 1]]
+        ):
+            order[position - 1], order[position] = (
+                order[position],
+                order[position - 1]
+            )
+            position -= 1
 
     def predict(self, input_, strategy=None, process=True):
         if strategy is None:
@@ -62,39 +799,117 @@ class SupervisedLearning(EventDispatcher):
             self.preprocess_input(input_) if process
             else deepcopy(input_)
         )
+        if self.memory.BATCHED:
+            self._execute(strategy, [input_], [preprocessed_input])
+            output = self.memory.output()[0]
+        else:
+            self._execute(strategy, input_, preprocessed_input)
+            output = self.memory.output()
+        # The output may be a view of the memory (e.g. of a `FastTape`),
+        # which the next execution changes
+        output = deepcopy(output)
+
+        postprocessed_output = (
+            self.postprocess_output(output) if process
+            else output
+        )
+        return postprocessed_output
+
+    def _prepare_states(self, data):
+        """Snapshot the memory with every sample's input, if supported"""
+        if self._start_state is None:
+            return None
+        if self.memory.BATCHED:
+            self._start([deepcopy(sample.input) for sample in data])
+            return [self.memory.snapshot()]
+        states = []
+        for sample in data:
+            self._start(deepcopy(sample.input))
+            states.append(self.memory.snapshot())
+        return states
+
+    def _prepare_expected_outputs(self, data):
+        """Outputs that a batched memory matches itself, if supported
+
+        Only outputs that are compared by their default comparator are
+        matched by the memory.
+        """
+        if not self.memory.BATCHED or self.comparator is not None:
+            return None
+        try:
+            return self.memory.expected_outputs(
+                [sample.output for sample in data]
+            )
+        except NotImplementedError:
+            return None
+
+    def _execute_sample(self, strategy, data, sample_index):
+        sample = data[sample_index]
+        if self._prepared_states is None:
+            input_ = deepcopy(sample.input)
+            self._execute(strategy, input_, input_)
+            return
+
         self.operations_counter.reset()
+        self.memory.restore(self._prepared_states[sample_index])
+        input_ = self._listener_input(sample.input)
+        self._execute_prepared(strategy, input_, input_)
+
+    def _listener_input(self, input_):
+        """Copy of a sample's input if listeners get it (and may change it)"""
+        if self.has_listeners('pre_strategy_execution'):
+            return deepcopy(input_)
+        return input_
+
+    def _execute(self, strategy, input_, preprocessed_input):
+        self._reset_operations_counter(preprocessed_input)
+        self._start(preprocessed_input)
+        self._execute_prepared(strategy, input_, preprocessed_input)
+
+    def _start(self, preprocessed_input):
+        """Bring the memory to the start state with the input"""
+        if self._start_state is not None:
+            self.memory.restore(self._start_state)
         self.memory.reset()
         self.memory.input(preprocessed_input)
 
-        event_args = {
-            'supervised_learning': self,
-            'strategy': strategy,
-            'input': input_,
-            'preprocessed_input': preprocessed_input
-        }
-        self.dispatch_event('pre_strategy_execution', event_args)
-        strategy(self.operations_counter)
+    def _reset_operations_counter(self, batch):
+        if self.memory.BATCHED:
+            self.operations_counter.lanes = len(batch)
+        self.operations_counter.reset()
 
-        postprocessed_output = (
-            self.postprocess_output(self.memory.output()) if process
-            else self.memory.output()
-        )
-        return postprocessed_output
+    def _execute_prepared(self, strategy, input_, preprocessed_input):
+        # Executed for every sample of every candidate, so the arguments
+        # are only built if they're needed
+        if self.has_listeners('pre_strategy_execution'):
+            self.dispatch_event('pre_strategy_execution', {
+                'supervised_learning': self,
+                'strategy': strategy,
+                'input': input_,
+                'preprocessed_input': preprocessed_input
+            })
+        if self.compile_strategies:
+            strategy.compile()(self.operations_counter)
+        else:
+            strategy(self.operations_counter)
 
     def _preprocess(self, data):
-        preprocessed_data = []
-        for sample in data:
-            input_ = self.preprocess_input(sample.input)
-            output = self.preprocess_output(sample.output)
-            preprocessed_sample = DataSample(input_, output)
-            preprocessed_data.append(preprocessed_sample)
-        return preprocessed_data
+        return [self._preprocess_sample(sample) for sample in data]
+
+    def _preprocess_sample(self, sample):
+        input_ = self.preprocess_input(sample.input)
+        output = self.preprocess_output(sample.output)
+        # Resolved once, so that scoring doesn't inspect the output type
+        comparator = self.comparator or comparator_for(output)
+        return DataSample(input_, output, comparator)
 
 
 class DataSample:
-    def __init__(self, input_, output):
+    def __init__(self, input_, output, comparator=same):
         self.input = input_
         self.output = output
+        # Function of (output, expected output) that checks if they match
+        self.comparator = comparator
 
     @staticmethod
     def from_dict(dict_):
@@ -109,3 +924,11 @@ class DataSample:
     @staticmethod
     def from_list_of_dicts(list_):
         return [DataSample.from_dict(sample) for sample in list_]
+
+    @staticmethod
+    def from_jsonl(path):
+        """Samples of a JSON Lines file (a dictionary per line), lazily"""
+        with open(path) as file:
+            for line in file:
+                if line.strip():
+                    yield DataSample.from_dict(loads(line))
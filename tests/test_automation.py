@@ -0,0 +1,29 @@
+from simple_algs.automation import function_from_examples
+from simple_algs.supervised_learning import SupervisedLearning
+
+examples = [
+    {'input': 2, 'output': 5},
+    {'input': 3, 'output': 7},
+    {'input': 5, 'output': 11}
+]
+
+
+def test_function_from_examples(tmp_path, monkeypatch):
+    file_path = str(tmp_path / 'function.json')
+    function = function_from_examples(
+        examples,
+        file_path,
+        brute_force_generator_max_length=3
+    )
+    assert 9 == function(4)
+
+    def search(*_):
+        raise AssertionError("The function should be read from the file")
+
+    monkeypatch.setattr(SupervisedLearning, '_search', search)
+    function = function_from_examples(
+        examples,
+        file_path,
+        brute_force_generator_max_length=3
+    )
+    assert 13 == function(6)
@@ -0,0 +1,60 @@
+from os.path import exists, join
+from time import sleep
+
+from numpy import array
+from pytest import raises
+
+from simple_algs.cache import ResultCache, ResultFile, content_hash
+from simple_algs.memory import Calculator
+
+
+def test_content_hash():
+    calculator = Calculator()
+    assert content_hash([array([1, 2])], calculator.actions) == content_hash(
+        [array([1, 2])],
+        Calculator().actions
+    )
+    assert content_hash(array([1, 2])) != content_hash(array([2, 1]))
+    assert content_hash({'a': 1}) != content_hash({'a': 2})
+    assert content_hash(calculator.add) != content_hash(calculator.deduct)
+
+
+def test_content_hash_functions():
+    def typing(digit):
+        return lambda: digit
+
+    # Constants, defaults and captured values are part of functions
+    assert content_hash(lambda: 3) != content_hash(lambda: 4)
+    assert content_hash(lambda x=3: x) != content_hash(lambda x=4: x)
+    assert content_hash(typing(3)) != content_hash(typing(4))
+    assert content_hash(typing(3)) == content_hash(typing(3))
+    with raises(ValueError):
+        content_hash(typing(object()))
+
+
+def test_result_cache(tmp_path):
+    directory = str(tmp_path)
+    cache = ResultCache(directory, max_entries=2)
+    cache.store('a', {'index': 1, 'score': 1})
+    sleep(0.01)
+    cache.store('b', {'index': 2, 'score': 1})
+    sleep(0.01)
+    assert {'index': 1, 'score': 1} == cache.lookup('a')
+    sleep(0.01)
+    cache.store('c', {'index': 3, 'score': 0.5})
+    assert cache.lookup('b') is None
+    assert {'index': 3, 'score': 0.5} == cache.lookup('c')
+
+    cache.invalidate('c')
+    assert cache.lookup('c') is None
+    assert cache.lookup('a') is not None
+    cache.invalidate()
+    assert not exists(join(directory, 'a.json'))
+
+
+def test_result_file(tmp_path):
+    result_file = ResultFile(str(tmp_path / 'result.json'))
+    assert result_file.lookup('a') is None
+    result_file.store('a', {'index': 1, 'score': 1})
+    assert {'index': 1, 'score': 1} == result_file.lookup('a')
+    assert result_file.lookup('b') is None
@@ -0,0 +1,80 @@
+from simple_algs.compact_strategy import CompactStrategy
+from simple_algs.control_structures import ConditionalStatement, WhileLoop
+from simple_algs.memory import Calculator, Tape
+from simple_algs.strategy import OperationsCounter
+from simple_algs.strategy_generators import (
+    BruteForceGenerator,
+    GrammarGenerator
+)
+from simple_algs.supervised_learning import DataSample, SupervisedLearning
+
+
+def test_compact_strategy_generation():
+    tape = Tape(2, (3,))
+    instructions = (
+        tape.actions,
+        [ConditionalStatement, WhileLoop],
+        tape.conditions
+    )
+    for generator_class in (BruteForceGenerator, GrammarGenerator):
+        generator = generator_class(*instructions, 3)
+        compact_generator = generator_class(*instructions, 3, compact=True)
+        generated = list(generator.generate_indexed())
+        compact_generated = list(compact_generator.generate_indexed())
+        assert len(generated) == len(compact_generated)
+        for (index, strategy), (compact_index, compact) in zip(
+                generated,
+                compact_generated
+        ):
+            assert index == compact_index
+            assert isinstance(compact, CompactStrategy)
+            assert strategy == compact.materialize()
+            assert index == compact_generator.index_of(compact)
+        assert generator.rejected == compact_generator.rejected
+        # Opcodes of a generator identify strategies
+        strategies = [strategy for _, strategy in compact_generated]
+        assert len(strategies) == len(set(strategies))
+        assert strategies[5] == compact_generator.strategy_at(
+            compact_generated[5][0]
+        )
+
+
+def test_compact_strategy_execute():
+    calculator = Calculator()
+    results = []
+    for compact in (False, True):
+        generator = BruteForceGenerator(
+            calculator.actions,
+            [],
+            [],
+            4,
+            compact=compact
+        )
+        # Digits (from the first instruction) 3, 11, 2 and 12 in base 15
+        index = 3 + 11 * 15 + 2 * 15 ** 2 + 12 * 15 ** 3
+        strategy = generator.strategy_at(index)
+        calculator.input(7)
+        operations_counter = OperationsCounter()
+        strategy(operations_counter)
+        results.append((
+            calculator.output(),
+            operations_counter.executed_operations,
+            str(strategy)
+        ))
+    assert 4 == results[0][1]
+    assert results[0] == results[1]
+
+
+def test_supervised_learning_compact_strategies():
+    data = [DataSample(2, 5), DataSample(3, 7), DataSample(5, 11)]
+    results = []
+    for compact in (False, True):
+        supervised_learning = SupervisedLearning(
+            Calculator(),
+            brute_force_generator_max_length=3,
+            compact_strategies=compact
+        )
+        stats = supervised_learning.fit(data)
+        results.append((stats.candidates, stats.best_index))
+        assert 9 == supervised_learning.predict(4)
+    assert results[0] == results[1]
@@ -3,7 +3,13 @@ from functools import partial
 
 from numpy import array
 
-from simple_algs.helpers import CustomBaseNumber, EventDispatcher, same
+from simple_algs.helpers import (
+    CustomBaseNumber,
+    EventDispatcher,
+    comparator_for,
+    register_comparator,
+    same
+)
 
 
 def test_custom_base_number_init():
@@ -26,6 +32,15 @@ def test_custom_base_number():
     assert CustomBaseNumber(1, 12) == number
 
 
+def test_custom_base_number_to_decimal():
+    assert 11 == CustomBaseNumber(11, 3).to_decimal()
+    assert 0 == CustomBaseNumber(0, 3).to_decimal()
+    assert CustomBaseNumber(5, 2) == CustomBaseNumber.from_digits(
+        [1, 0, 1, 0],
+        2
+    )
+
+
 def test_event_dispatcher():
     class Human(EventDispatcher):
         def __init__(self):
@@ -53,6 +68,37 @@ def test_event_dispatcher():
     assert 4 == counter.eaten_kitties
 
 
+def test_event_dispatcher_listeners():
+    dispatcher = EventDispatcher()
+    assert not dispatcher.has_listeners('cat_eaten')
+    assert () == dispatcher.listeners('cat_eaten')
+    dispatcher.dispatch_event('cat_eaten', {'name': 'kitty'})
+
+    names = []
+    dispatcher.add_event_listener('cat_eaten', lambda a: names.append(a))
+    dispatcher.add_event_listener('cat_eaten', lambda a: names.append(a))
+    assert dispatcher.has_listeners('cat_eaten')
+    dispatcher.dispatch_event('cat_eaten', {'name': 'kitty'})
+    assert [{'name': 'kitty'}] * 2 == names
+
+    # Callable args are passed to listeners as they are
+    dispatcher.dispatch_event('cat_eaten', len)
+    assert len is names[-1]
+
+    listener = names.append
+    dispatcher = EventDispatcher({'cat_eaten': [listener], 'dog_eaten': []})
+    assert (listener,) == dispatcher.listeners('cat_eaten')
+    assert not dispatcher.has_listeners('dog_eaten')
+
+    # Listeners can be changed directly
+    dispatcher.event_listeners['dog_eaten'].append(listener)
+    dispatcher.dispatch_event('dog_eaten', 'rex')
+    dispatcher.event_listeners = {}
+    dispatcher.dispatch_event('cat_eaten', 'kitty')
+    assert not dispatcher.has_listeners('cat_eaten')
+    assert [{'name': 'kitty'}] * 2 + [len] * 2 + ['rex'] == names
+
+
 def test_same():
     class A:
         def __init__(self, a_, b_):
@@ -144,3 +190,53 @@ def test_same():
 
     assert same(array([1, 2, 3]), array([1, 2, 3]))
     assert not same(array([3, 2, 1]), array([1, 2, 3]))
+
+
+def test_comparator_for():
+    values = [
+        1,
+        'ab',
+        None,
+        array([[1, 2], [3, 4]]),
+        array([1.5, float('nan')]),
+        [1, 2],
+        [[1, 2], [3]],
+        ([1], (2, 3)),
+        {'a': 1, 'b': [2, array([3])]}
+    ]
+    others = values + [
+        1.0,
+        True,
+        array([[1, 2], [3, 5]]),
+        array([1, 2, 3, 4]),
+        array([[1.0, 2.0], [3.0, 4.0]]),
+        [[1, 2], [4]],
+        [[1, 2]],
+        [(1, 2), [3]],
+        # Equality of arrays has no truth value
+        [array([1, 2]), array([3, 4])],
+        {'a': 1, 'b': [2, array([3])], 'c': 3},
+        {'a': 1, 'b': [2, array([4])]},
+        {'a': 1}
+    ]
+    for expected in values:
+        comparator = comparator_for(expected)
+        for value in others:
+            assert same(value, expected) == comparator(value, expected)
+
+
+def test_register_comparator():
+    class Point:
+        def __init__(self, x):
+            self.x = x
+
+    assert same is comparator_for(Point(1))
+    register_comparator(Point, lambda expected: lambda a, b: a.x == b.x)
+    assert comparator_for(Point(1))(Point(2), Point(2))
+    assert not comparator_for(Point(1))(Point(2), Point(3))
+
+    class Number(int):
+        pass
+
+    # Subclasses aren't resolved by the registry
+    assert same is comparator_for(Number(1))
@@ -1,3 +1,6 @@
+from copy import copy
+
+from simple_algs.helpers import same
 from simple_algs.instructions import Action
 from simple_algs.strategy import OperationsCounter
 
@@ -25,3 +28,22 @@ def test_action_execute():
     action.execute(counter)
     assert 3 == RandomClass.random_attribute
     assert 2 == counter.executed_operations
+
+
+def test_instruction_calling_convention():
+    def plain():
+        pass
+
+    def counted(operations_counter):
+        pass
+
+    action = Action(plain)
+    assert not action.takes_operations_counter
+    action.execution = counted
+    assert action.takes_operations_counter
+    assert not hasattr(action, '__dict__')
+
+    copied = copy(action)
+    assert copied.takes_operations_counter
+    assert same(action, copied)
+    assert not same(action, Action(plain))
@@ -1,7 +1,30 @@
+from functools import partial
+
 from numpy import zeros, array, array_equal
+from pytest import raises
 
+from simple_algs.control_structures import (
+    BatchConditionalStatement,
+    BatchWhileLoop,
+    ConditionalStatement,
+    WhileLoop
+)
 from simple_algs.helpers import same
-from simple_algs.memory import MemoryCollection, Tape, Calculator
+from simple_algs.instructions import Action, Condition
+from simple_algs.memory import (
+    BatchCalculator,
+    BatchTape,
+    Calculator,
+    FastTape,
+    Ignored,
+    MemoryCollection,
+    Tape
+)
+from simple_algs.strategy import (
+    BatchOperationsCounter,
+    OperationsCounter,
+    Strategy
+)
 
 
 def test_memory_collection():
@@ -111,3 +134,207 @@ def test_calculator3():
     calculator.add()
     calculator.type(1)
     assert 7 == calculator.output()
+
+
+def test_fingerprint():
+    calculator = Calculator(3)
+    fingerprint = calculator.fingerprint()
+    calculator.type(1)
+    assert fingerprint != calculator.fingerprint()
+
+    tape = Tape(9, (2, 2), zeros([2, 2]))
+    fingerprint = tape.fingerprint()
+    tape.increment_pointer(0)
+    tape.decrement_pointer(0)
+    assert fingerprint == tape.fingerprint()
+    tape.set(3)
+    assert fingerprint != tape.fingerprint()
+
+    collection = MemoryCollection({'tape': tape, 'calculator': calculator})
+    fingerprint = collection.fingerprint()
+    calculator.add()
+    assert fingerprint != collection.fingerprint()
+
+
+def test_snapshot_restore():
+    tape = Tape(9, (2, 2), zeros([2, 2]))
+    calculator = Calculator(3)
+    collection = MemoryCollection({'tape': tape, 'calculator': calculator})
+    snapshot = collection.snapshot()
+
+    for _ in range(2):
+        tape.increment_pointer(1)
+        tape.set(5)
+        calculator.add()
+        calculator.type(4)
+        collection.restore(snapshot)
+        assert array_equal(zeros([2, 2]), tape.output())
+        assert [0, 0] == tape.pointer
+        assert 3 == calculator.output()
+        calculator.restore(snapshot['calculator'])
+
+    restored_data = tape.data
+    tape.set(7)
+    tape.restore(snapshot['tape'])
+    assert restored_data is tape.data
+    assert 0 == tape.get()
+
+
+def test_fast_tape():
+    data = array([[1, 2, 3, 4], [5, 6, 7, 8], [9, 0, 1, 2]])
+    tape = Tape(9, (3, 4))
+    fast_tape = FastTape(9, (3, 4))
+    for memory in (tape, fast_tape):
+        memory.input(data.copy())
+    moves = [
+        (0, 1), (1, 1), (1, 1), (0, -1), (1, -1), (1, -1), (1, -1),
+        (0, 1), (0, 1), (0, 1), (1, 1), (0, -1)
+    ]
+    for step, (axis, direction) in enumerate(moves):
+        for memory in (tape, fast_tape):
+            if direction > 0:
+                memory.increment_pointer(axis)
+            else:
+                memory.decrement_pointer(axis)
+            if step % 3 == 0:
+                memory.select_value(step % 10)
+                memory.set_selected()
+        assert tuple(tape.pointer) == fast_tape.pointer
+        assert tape.get() == fast_tape.get()
+    assert array_equal(tape.output(), fast_tape.output())
+    with raises(ValueError):
+        fast_tape.increment_pointer(2)
+
+    # The buffer is reused by inputs, resets, restores and shape changes
+    buffer = fast_tape._buffer
+    snapshot = fast_tape.snapshot()
+    fast_tape.reset()
+    fast_tape.input(data.T.copy())
+    assert (4, 3) == fast_tape.shape
+    fast_tape.pointer = [3, 1]
+    assert (3, 1) == fast_tape.pointer
+    with raises(TypeError):
+        fast_tape.pointer[0] = 2
+    assert data[1, 3] == fast_tape.get()
+    fast_tape.restore(snapshot)
+    assert array_equal(tape.output(), fast_tape.output())
+    assert tuple(tape.pointer) == fast_tape.pointer
+    fast_tape.shape = (2, 2)
+    assert (2, 2) == fast_tape.data.shape
+    assert buffer is fast_tape._buffer
+    fast_tape.input(zeros([4, 4], dtype=int))
+    assert buffer is not fast_tape._buffer
+
+
+def test_fast_tape_empty():
+    for shape in ((0,), (2, 0)):
+        tape = Tape(9, shape)
+        fast_tape = FastTape(9, shape)
+        for axis in range(len(shape)):
+            for memory in (tape, fast_tape):
+                memory.increment_pointer(axis)
+            assert tuple(tape.pointer) == fast_tape.pointer
+
+
+def test_batch_tape():
+    def strategy(tape, conditional_statement, while_loop):
+        return Strategy([
+            Action(partial(tape.increment_pointer, axis=0)),
+            while_loop(
+                Condition(partial(tape.indicated_value_equals, value=0)),
+                Strategy([
+                    Action(partial(tape.set, value=1)),
+                    Action(partial(tape.increment_pointer, axis=0))
+                ])
+            ),
+            conditional_statement(
+                Condition(partial(tape.indicated_value_equals, value=3)),
+                Strategy([Action(partial(tape.set, value=7))])
+            )
+        ])
+
+    inputs = [array([0, 0, 3, 0]), array([4, 0, 0, 0]), array([3, 3, 0, 1])]
+    for limit in (100, 6):
+        batch_tape = BatchTape(9, (4,))
+        batch_tape.input(inputs)
+        batch_counter = BatchOperationsCounter(len(inputs), limit)
+        strategy(
+            batch_tape,
+            BatchConditionalStatement,
+            BatchWhileLoop
+        ).execute(batch_counter)
+
+        for lane, input_ in enumerate(inputs):
+            tape = Tape(9, (4,))
+            tape.input(input_.copy())
+            counter = OperationsCounter(limit)
+            strategy(tape, ConditionalStatement, WhileLoop).execute(counter)
+            assert array_equal(tape.output(), batch_tape.output()[lane])
+            assert (
+                counter.executed_operations ==
+                batch_counter.executed_operations[lane]
+            )
+
+
+def test_batch_calculator():
+    inputs = [7, 0, -3, 12]
+    strategies = [
+        ['divide', 'type 0', 'add', 'type 2'],
+        ['type 1', 'type 2', 'multiply', 'deduct', 'type 5'],
+        ['deduct', 'type 9', 'divide', 'type 2', 'multiply'],
+        # x / x divides by zero only in the lane whose input is 0
+        ['divide', 'divide', 'type 3', 'add']
+    ]
+    for names in strategies:
+        batch_calculator = BatchCalculator()
+        batch_calculator.input(inputs)
+        batch_counter = BatchOperationsCounter(len(inputs))
+        batch_snapshot = None
+        for index, name in enumerate(names):
+            if index == 2:
+                batch_snapshot = batch_calculator.snapshot()
+            action = name.split()
+            execution = getattr(batch_calculator, action[0])
+            if len(action) > 1:
+                execution = partial(execution, digit=int(action[1]))
+            Action(execution)(batch_counter)
+        batch_output = batch_calculator.output()
+        batch_calculator.restore(batch_snapshot)
+        assert batch_snapshot[0].tobytes() == \
+            batch_calculator.snapshot()[0].tobytes()
+
+        for lane, input_ in enumerate(inputs):
+            calculator = Calculator()
+            calculator.input(input_)
+            counter = OperationsCounter()
+            for name in names:
+                action = name.split()
+                execution = getattr(calculator, action[0])
+                if len(action) > 1:
+                    execution = partial(execution, digit=int(action[1]))
+                Action(execution)(counter)
+            assert calculator.output() == batch_output[lane]
+            assert int is type(batch_output[lane])
+            assert (
+                counter.executed_operations ==
+                batch_counter.executed_operations[lane]
+            )
+
+    batch_calculator = BatchCalculator()
+    batch_calculator.input([3, 5])
+    batch_calculator.add()
+    batch_calculator.type(2)
+    expected_outputs = batch_calculator.expected_outputs([5, 6])
+    assert [True, False] == batch_calculator.matches(expected_outputs).tolist()
+    for outputs in ([5, 2.0], [5, 2 ** 70]):
+        assert batch_calculator.expected_outputs(outputs) is None
+
+
+def test_distance():
+    tape = Tape(3, (2, 2))
+    assert 0 == tape.distance(array([[1, 2], [3, 0]]), array([[1, 2], [3, 0]]))
+    assert 2 == tape.distance(array([[1, 2], [3, 0]]), array([[1, 0], [0, 0]]))
+    assert 4 == tape.distance(array([[1, 2], [3, 0]]), array([1, 2, 3]))
+    calculator = Calculator()
+    assert 7 == calculator.distance(3, 10)
+    assert 1 == Ignored().distance('a', 'b')
@@ -0,0 +1,83 @@
+from numpy import array
+from pytest import raises
+
+from simple_algs.control_structures import ConditionalStatement, WhileLoop
+from simple_algs.instructions import Instruction
+from simple_algs.memory import Calculator, Tape
+from simple_algs.profiler import Profiler
+from simple_algs.supervised_learning import DataSample, SupervisedLearning
+
+
+def test_profiler():
+    data = [DataSample(2, 5), DataSample(3, 7), DataSample(5, 11)]
+    instruction_call = Instruction.__call__
+    profiler = Profiler()
+    supervised_learning = SupervisedLearning(
+        Calculator(),
+        brute_force_generator_max_length=3,
+        compile_strategies=True,
+        profiler=profiler
+    )
+    stats = supervised_learning.fit(data)
+    assert 9 == supervised_learning.predict(4)
+
+    # Everything is restored after the fit
+    assert instruction_call is Instruction.__call__
+    assert supervised_learning.compile_strategies
+    assert '_score' not in vars(supervised_learning)
+    assert 'restore' not in vars(supervised_learning.memory)
+
+    calls, total, self_time, rejected = profiler.entries['score']
+    assert stats.candidates == calls
+    assert 0 < self_time <= total
+    # Only candidates that improved the best score aren't rejected
+    assert 0 < rejected < total
+    # Every sample's state is prepared from the start state once
+    restores = profiler.entries['memory.restore'][0]
+    assert 3 * stats.candidates + 3 == restores
+    assert 'type(digit=1)' in profiler.entries
+    assert 'add' in profiler.report()
+    assert 6 == len(profiler.report(5).splitlines())
+
+    stacks = profiler.collapsed_stacks().splitlines()
+    roots = set()
+    for line in stacks:
+        stack, microseconds = line.rsplit(' ', 1)
+        roots.add(stack.split(';')[0])
+        assert int(microseconds) > 0
+    assert {'fit', 'improved', 'rejected'} == roots
+    assert any(line.startswith('rejected;score;add ') for line in stacks)
+
+    supervised_learning.parallel = 2
+    with raises(ValueError):
+        supervised_learning.fit(data)
+    assert instruction_call is Instruction.__call__
+
+    # Instruction.__call__ can only be replaced by one profiler at a time
+    supervised_learning.parallel = None
+    with profiler.attached(supervised_learning):
+        with raises(ValueError):
+            with Profiler().attached(supervised_learning):
+                pass
+    assert instruction_call is Instruction.__call__
+
+
+def test_profiler_control_structures():
+    tape = Tape(2, (3,))
+    tape.control_structures = [ConditionalStatement, WhileLoop]
+    profiler = Profiler()
+    supervised_learning = SupervisedLearning(
+        tape,
+        preprocess_input=array,
+        preprocess_output=array,
+        brute_force_generator_max_length=3,
+        accepted_score=2,
+        max_candidates=200,
+        profiler=profiler
+    )
+    supervised_learning.fit([DataSample([0, 1, 2], [2, 1, 2])])
+    assert 'WHILE' in profiler.entries
+    assert any(label.startswith('condition:') for label in profiler.entries)
+    # Time of a control structure includes its condition and body
+    calls, total, self_time, _ = profiler.entries['WHILE']
+    assert self_time < total
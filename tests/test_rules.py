@@ -0,0 +1,69 @@
+from random import Random
+
+from numpy import array
+
+from simple_algs.instructions import Action
+from simple_algs.memory import Calculator, MemoryCollection, Tape
+
+
+def test_tape_rules():
+    tape = Tape(2, (3, 2))
+    actions = [Action(action) for action in tape.actions]
+    pairs = tape.rules.redundant_pairs(actions)
+    random = Random(0)
+    states = []
+    for _ in range(50):
+        tape.input(array([
+            [random.randint(0, 2) for _ in range(2)] for _ in range(3)
+        ]))
+        for _ in range(random.randint(0, 4)):
+            random.choice(tape.actions)()
+        states.append(tape.snapshot())
+
+    def run(indices, state):
+        tape.restore(state)
+        for index in indices:
+            tape.actions[index]()
+        return tape.fingerprint()
+
+    # Every redundant pair has an equivalent without it
+    for first, second in pairs:
+        assert any(
+            all(
+                run([first, second], state) == run(equivalent, state)
+                for state in states
+            )
+            for equivalent in ([], [first], [second], [second, first])
+        )
+    set_0, set_1, _, get, increment_0, increment_1, decrement_0, _ = range(8)
+    assert (set_0, set_1) in pairs
+    assert (get, increment_0) in pairs
+    assert (increment_0, decrement_0) in pairs
+    assert (decrement_0, increment_0) in pairs
+    assert (increment_1, increment_0) in pairs
+    assert (increment_0, increment_1) not in pairs
+    assert (increment_0, increment_0) not in pairs
+
+
+def test_memory_collection_rules():
+    first = Tape(1, (2,))
+    second = Tape(1, (2,))
+    collection = MemoryCollection({'first': first, 'second': second})
+    pairs = collection.rules.redundant_pairs(
+        [Action(action) for action in collection.actions]
+    )
+    # Facts about one tape don't apply to the actions of the other one
+    assert 2 * len(first.rules.redundant_pairs(
+        [Action(action) for action in first.actions]
+    )) == len(pairs)
+
+
+def test_calculator_rules():
+    calculator = Calculator()
+    assert not calculator.rules.redundant_pairs(
+        [Action(action) for action in calculator.actions]
+    )
+    actions = [Action(action) for action in calculator.actions]
+    actions.append(Action(calculator.equal))
+    pairs = calculator.rules.redundant_pairs(actions)
+    assert {(14, 14), (14, 10), (14, 11), (14, 12), (14, 13)} == pairs
@@ -1,6 +1,7 @@
 from functools import partial
 
-from simple_algs.instructions import Action
+from simple_algs.control_structures import ConditionalStatement, WhileLoop
+from simple_algs.instructions import Action, Condition
 from simple_algs.memory import Calculator
 from simple_algs.strategy import Strategy, OperationsCounter
 
@@ -17,6 +18,49 @@ def test_strategy_execute():
     assert 4 == memory.output()
 
 
+def test_strategy_compile():
+    def build(memory):
+        def below_100():
+            return memory.output() < 100
+
+        def add_counted(operations_counter):
+            operations_counter.increment()
+            memory.add()
+
+        return Strategy([
+            Action(partial(memory.type, digit=1)),
+            ConditionalStatement(
+                Condition(lambda: False),
+                Strategy([Action(partial(memory.type, digit=9))])
+            ),
+            WhileLoop(
+                Condition(below_100),
+                Strategy([
+                    Action(add_counted),
+                    Action(partial(memory.type, digit=7)),
+                    ConditionalStatement(Condition(lambda: True))
+                ])
+            ),
+            Action(memory.deduct),
+            Action(partial(memory.type, digit=2))
+        ])
+
+    for limit in (1000, 12, 5):
+        interpreted_memory = Calculator()
+        interpreted_counter = OperationsCounter(limit)
+        build(interpreted_memory).execute(interpreted_counter)
+
+        compiled_memory = Calculator()
+        compiled_counter = OperationsCounter(limit)
+        build(compiled_memory).compile()(compiled_counter)
+
+        assert interpreted_memory.output() == compiled_memory.output()
+        assert (
+            interpreted_counter.executed_operations ==
+            compiled_counter.executed_operations
+        )
+
+
 def test_strategy_eq():
     def a():
         return 1
@@ -66,3 +110,39 @@ def test_strategy_eq():
         ]
     )
     assert strategy9 != strategy10
+
+
+def test_strategy_canonical_key():
+    calculator = Calculator()
+    other_calculator = Calculator()
+
+    def build(memory, digit):
+        return Strategy([
+            Action(partial(memory.type, digit=digit)),
+            WhileLoop(
+                Condition(memory.output),
+                Strategy([Action(memory.add)])
+            ),
+            memory.deduct
+        ])
+
+    assert build(calculator, 1).canonical_key() == \
+        build(calculator, 1).canonical_key()
+    assert hash(build(calculator, 1).canonical_key()) == \
+        hash(build(calculator, 1).canonical_key())
+    assert build(calculator, 1).canonical_key() != \
+        build(calculator, 2).canonical_key()
+    # Unlike `same`, methods of copies of a memory are different
+    assert build(calculator, 1) == build(other_calculator, 1)
+    assert build(calculator, 1).canonical_key() != \
+        build(other_calculator, 1).canonical_key()
+
+    loop = WhileLoop(Condition(calculator.output), Strategy())
+    flat = Strategy([loop, Action(calculator.add)])
+    nested = Strategy([
+        WhileLoop(
+            Condition(calculator.output),
+            Strategy([Action(calculator.add)])
+        )
+    ])
+    assert flat.canonical_key() != nested.canonical_key()
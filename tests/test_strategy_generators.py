@@ -1,9 +1,15 @@
 from functools import partial
 
+from pytest import raises
+
 from simple_algs.control_structures import ConditionalStatement, WhileLoop
-from simple_algs.memory import Calculator
+from simple_algs.memory import Calculator, MemoryCollection, Tape
 from simple_algs.strategy import Strategy
-from simple_algs.strategy_generators import BruteForceGenerator
+from simple_algs.strategy_generators import (
+    BestFirstGenerator,
+    BruteForceGenerator,
+    GrammarGenerator
+)
 from simple_algs.instructions import Action, Condition
 
 actions = [Action(lambda: None), Action(lambda: None), Action(lambda: None)]
@@ -65,6 +71,220 @@ def test_brute_force_generator_2():
     assert strategy in generated
 
 
+def test_brute_force_generator_ranges():
+    generator = BruteForceGenerator(actions, control_structures, conditions, 3)
+    assert 10 ** 3 == generator.size()
+
+    indexed = list(generator.generate_indexed())
+    split = list(generator.generate_indexed(0, 400))
+    split += list(generator.generate_indexed(400, 1000))
+    assert [index for index, _ in indexed] == [index for index, _ in split]
+    for (_, strategy), (_, other) in zip(indexed, split):
+        assert strategy == other
+
+
+def test_brute_force_generator_random_access():
+    generator = BruteForceGenerator(actions, control_structures, conditions, 4)
+    for index, strategy in generator.generate_indexed(0, 3000):
+        assert strategy == generator.strategy_at(index)
+        assert index == generator.index_of(strategy)
+
+    strategy = Strategy(
+        [
+            ConditionalStatement(conditions[0], Strategy([actions[1]])),
+            actions[2]
+        ]
+    )
+    assert strategy == generator.strategy_at(generator.index_of(strategy))
+    assert list(generator.generate(500, 520)) == [
+        strategy for index, strategy in generator.generate_indexed()
+        if 500 <= index < 520
+    ]
+    with raises(ValueError):
+        generator.strategy_at(len(generator._instructions))
+    with raises(IndexError):
+        generator.strategy_at(generator.size())
+
+
+def test_brute_force_generator_random_access_of_elements():
+    # Elements of the same class have methods with the same functions
+    first, second = Tape(2, (2,)), Tape(2, (2,))
+    memory = MemoryCollection(
+        {'first': first, 'second': second},
+        input_element=first,
+        output_element=second
+    )
+    generator = BruteForceGenerator(
+        memory.actions,
+        memory.control_structures,
+        memory.conditions,
+        2
+    )
+    for index, strategy in generator.generate_indexed(0, 2000):
+        assert index == generator.index_of(strategy)
+
+
+def test_grammar_generator():
+    brute_force = BruteForceGenerator(
+        actions,
+        control_structures,
+        conditions,
+        4
+    )
+    grammar = GrammarGenerator(actions, control_structures, conditions, 4)
+    expected = list(brute_force.generate_indexed())
+    generated = list(grammar.generate_indexed())
+    assert [index for index, _ in expected] == [
+        index for index, _ in generated
+    ]
+    for (_, strategy), (_, other) in zip(expected, generated):
+        assert strategy == other
+
+    expected = list(brute_force.generate_indexed(1234, 5678))
+    generated = list(grammar.generate_indexed(1234, 5678))
+    assert [index for index, _ in expected] == [
+        index for index, _ in generated
+    ]
+
+    calculator_memory = Calculator()
+    brute_force = BruteForceGenerator(calculator_memory.actions, [], [], 3)
+    grammar = GrammarGenerator(calculator_memory.actions, [], [], 3)
+    assert list(brute_force.generate()) == list(grammar.generate())
+
+
+def test_generator_rules():
+    tape = Tape(2, (3,))
+    arguments = (tape.actions, control_structures, tape.conditions, 4)
+    all_strategies = list(BruteForceGenerator(*arguments).generate_indexed())
+    brute_force = BruteForceGenerator(*arguments, rules=tape.rules)
+    grammar = GrammarGenerator(*arguments, rules=tape.rules)
+    expected = list(brute_force.generate_indexed())
+    generated = list(grammar.generate_indexed())
+    assert [index for index, _ in expected] == [
+        index for index, _ in generated
+    ]
+    assert len(expected) < 0.6 * len(all_strategies)
+    assert set(index for index, _ in expected) < set(
+        index for index, _ in all_strategies
+    )
+
+    increment, decrement = brute_force.actions[4:6]
+
+    def check(strategy):
+        listed = strategy.instructions
+        for first, second in zip(listed, listed[1:]):
+            assert (first, second) != (increment, decrement)
+        for instruction in listed:
+            if isinstance(instruction, ConditionalStatement):
+                assert instruction.body.instructions
+            if hasattr(instruction, 'body'):
+                check(instruction.body)
+
+    for _, strategy in expected:
+        check(strategy)
+
+
+def test_generate_depth_first():
+    tape = Tape(2, (3,))
+    for rules in (None, tape.rules):
+        generator = BruteForceGenerator(
+            tape.actions,
+            control_structures,
+            tape.conditions,
+            3,
+            rules
+        )
+        expected = dict(generator.generate_indexed())
+        generated = list(generator.generate_depth_first())
+        assert sorted(expected) == sorted(index for index, *_ in generated)
+        previous = (-1, ())
+        for index, strategy, digits, ends in generated:
+            assert expected[index] == strategy
+            assert previous < (len(digits), digits)
+            assert len(strategy.instructions) == len(ends)
+            assert len(digits) == (ends[-1] if ends else 0)
+            previous = (len(digits), digits)
+
+
+def test_best_first_generator():
+    brute_force = BruteForceGenerator(
+        actions,
+        control_structures,
+        conditions,
+        3
+    )
+    best_first = BestFirstGenerator(actions, control_structures, conditions, 3)
+    expected = list(brute_force.generate_indexed())
+    generated = list(best_first.generate_indexed())
+    assert [index for index, _ in expected] == sorted(
+        index for index, _ in generated
+    )
+    for index, strategy in generated:
+        assert brute_force.strategy_at(index) == strategy
+    with raises(ValueError):
+        next(best_first.generate_indexed(1))
+
+    # Extensions of the cheapest strategy come right after the strategies
+    # of one instruction
+    order = []
+    for index, strategy in best_first.generate_indexed():
+        order.append(strategy.instructions)
+        best_first.report(
+            strategy,
+            0 if strategy.instructions == [actions[2]] else 1
+        )
+    start = 1 + len(actions) + len(control_structures) * len(conditions)
+    assert all(len(instructions) == 1 for instructions in order[1:start])
+    for instructions in order[start:start + 3]:
+        assert [actions[2]] == instructions[:1]
+        assert 2 == len(instructions)
+
+
+def test_generator_seen_size():
+    duplicated_actions = actions + actions[:2]
+    for generator_class in (
+            BruteForceGenerator,
+            GrammarGenerator,
+            BestFirstGenerator
+    ):
+        generator = generator_class(
+            duplicated_actions,
+            control_structures,
+            conditions,
+            3,
+            seen_size=10 ** 6
+        )
+        keys = [strategy.canonical_key() for strategy in generator.generate()]
+        assert len(keys) == len(set(keys))
+        unique = BruteForceGenerator(
+            actions,
+            control_structures,
+            conditions,
+            3
+        )
+        assert len(list(unique.generate())) == len(keys)
+        assert generator.duplicates > 0
+
+    generator = BruteForceGenerator(
+        duplicated_actions,
+        control_structures,
+        conditions,
+        3,
+        seen_size=1
+    )
+    keys = [strategy.canonical_key() for strategy in generator.generate()]
+    assert len(keys) > len(set(keys))
+    # Without duplicated instructions, all strategies are distinct
+    generator = BruteForceGenerator(
+        actions,
+        control_structures,
+        conditions,
+        3,
+        seen_size=10 ** 6
+    )
+    list(generator.generate())
+    assert 0 == generator.duplicates
+
 # control_structures_normalizer_data = [
 #     (
 #         [
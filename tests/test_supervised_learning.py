@@ -2,10 +2,30 @@ from copy import deepcopy
 from json import load
 
 from numpy import array
-from pytest import mark
+from pytest import mark, raises
 
+from simple_algs.cache import ResultCache
 from simple_algs.instructions import ControlStructure
-from simple_algs.memory import Calculator, Tape, MemoryCollection, Ignored
+from simple_algs.control_structures import (
+    BatchConditionalStatement,
+    BatchWhileLoop,
+    ConditionalStatement,
+    WhileLoop
+)
+from simple_algs.memory import (
+    BatchCalculator,
+    BatchTape,
+    Calculator,
+    FastTape,
+    Ignored,
+    MemoryCollection,
+    Tape
+)
+from simple_algs.strategy_generators import (
+    BestFirstGenerator,
+    BruteForceGenerator
+)
+from simple_algs.search_stats import SearchStats
 from simple_algs.supervised_learning import SupervisedLearning, DataSample
 
 
@@ -22,6 +42,589 @@ def test_supervised_learning_1():
         assert sample.output == supervised_learning.predict(sample.input)
 
 
+def test_supervised_learning_compiled():
+    training_data = [DataSample(2, 5), DataSample(3, 7), DataSample(5, 11)]
+    supervised_learning = SupervisedLearning(
+        Calculator(),
+        brute_force_generator_max_length=3,
+        compile_strategies=True
+    )
+    supervised_learning.fit(training_data)
+    assert 1 == supervised_learning.best_score
+    assert 9 == supervised_learning.predict(4)
+
+
+def test_supervised_learning_comparator():
+    training_data = [DataSample(2, 5), DataSample(3, 7), DataSample(5, 11)]
+    compared = []
+
+    def comparator(output, expected):
+        compared.append(expected)
+        return output == expected
+
+    supervised_learning = SupervisedLearning(
+        Calculator(),
+        brute_force_generator_max_length=3,
+        comparator=comparator
+    )
+    supervised_learning.fit(training_data)
+    assert 1 == supervised_learning.best_score
+    assert compared and set(compared) == {5, 7, 11}
+
+
+def test_supervised_learning_parallel():
+    training_data = [DataSample(2, 5), DataSample(3, 7), DataSample(5, 11)]
+    sequential = SupervisedLearning(
+        Calculator(),
+        brute_force_generator_max_length=3
+    )
+    sequential.fit(training_data)
+
+    parallel = SupervisedLearning(
+        Calculator(),
+        brute_force_generator_max_length=3,
+        parallel=2,
+        parallel_chunk_size=100
+    )
+    parallel.fit(training_data)
+    assert 1 == parallel.best_score
+    assert sequential.best_strategy == parallel.best_strategy
+    assert 9 == parallel.predict(4)
+
+
+def test_supervised_learning_prune_equivalent():
+    training_data = [DataSample(2, 5), DataSample(3, 7), DataSample(5, 11)]
+    executions = {}
+    results = {}
+    for prune_equivalent in (False, True):
+        supervised_learning = SupervisedLearning(
+            Calculator(),
+            brute_force_generator_max_length=3,
+            prune_equivalent=prune_equivalent
+        )
+        executions[prune_equivalent] = 0
+
+        def count(_):
+            executions[prune_equivalent] += 1
+
+        supervised_learning.add_event_listener('pre_strategy_execution', count)
+        supervised_learning.fit(training_data)
+        results[prune_equivalent] = supervised_learning.best_strategy
+    assert results[False] == results[True]
+    assert executions[True] < executions[False]
+    with raises(ValueError):
+        SupervisedLearning(
+            Calculator(),
+            brute_force_generator_max_length=3,
+            parallel=2,
+            prune_equivalent=True
+        ).fit(training_data)
+
+
+@mark.parametrize("max_length, accepted_score", [(3, 1), (2, 1), (2, 0.5)])
+def test_supervised_learning_early_exit(max_length, accepted_score):
+    training_data = [
+        DataSample(2, 5),
+        DataSample(3, 7),
+        DataSample(5, 11),
+        DataSample(0, 1)
+    ]
+    executions = {}
+    results = {}
+    for early_exit in (False, True):
+        supervised_learning = SupervisedLearning(
+            Calculator(),
+            brute_force_generator_max_length=max_length,
+            accepted_score=accepted_score,
+            early_exit=early_exit
+        )
+        executions[early_exit] = 0
+
+        def count(_):
+            executions[early_exit] += 1
+
+        supervised_learning.add_event_listener('pre_strategy_execution', count)
+        supervised_learning.fit(training_data)
+        results[early_exit] = (
+            supervised_learning.best_strategy,
+            supervised_learning.best_score
+        )
+    assert results[False] == results[True]
+    assert executions[True] < executions[False]
+
+
+def test_supervised_learning_early_exit_lengths():
+    training_data = [
+        DataSample(4, 4),
+        DataSample(3, 24),
+        DataSample(7, 11),
+        DataSample(9, 9)
+    ]
+    lengths = {}
+    for early_exit in (False, True):
+        supervised_learning = SupervisedLearning(
+            Calculator(),
+            brute_force_generator_max_length=2,
+            accepted_score=2,
+            early_exit=early_exit
+        )
+        lengths[early_exit] = supervised_learning.fit(training_data).lengths
+    assert lengths[False].keys() == lengths[True].keys()
+    for length, length_stats in lengths[True].items():
+        exact = lengths[False][length]
+        assert exact['candidates'] == length_stats['candidates']
+        # Early exits only give upper bounds of scores, which aren't
+        # recorded, so lengths can only miss scores below the best one
+        assert length_stats['best_score'] in (exact['best_score'], 0)
+    assert 0.25 == lengths[False][1]['best_score']
+    assert 0 == lengths[True][1]['best_score']
+
+
+def test_supervised_learning_cache(tmp_path):
+    training_data = [
+        DataSample([0, 0], [1, 0]),
+        DataSample([0, 1], [1, 1])
+    ]
+    cache = ResultCache(str(tmp_path))
+    for stop_reason in ('accepted', 'cached'):
+        # The strategy is in the actions of the second element only
+        first, second = Tape(2, (2,)), Tape(2, (2,))
+        supervised_learning = SupervisedLearning(
+            MemoryCollection(
+                {'first': first, 'second': second},
+                input_element=second,
+                output_element=second
+            ),
+            preprocess_input=array,
+            preprocess_output=array,
+            postprocess_output=lambda output: output.tolist(),
+            brute_force_generator_max_length=2,
+            cache=cache
+        )
+        stats = supervised_learning.fit(training_data)
+        assert stop_reason == stats.stop_reason
+        for sample in training_data:
+            assert sample.output == supervised_learning.predict(sample.input)
+
+    # Results of other comparators aren't reused
+    supervised_learning.comparator = lambda output, expected: True
+    assert 'cached' != supervised_learning.fit(training_data).stop_reason
+
+    # Nor results of actions that only differ in captured values
+    for digit in (3, 4):
+        calculator = Calculator()
+
+        def type_digit():
+            calculator.type(digit)
+
+        supervised_learning = SupervisedLearning(
+            calculator,
+            strategy_generator=BruteForceGenerator(
+                [calculator.add, type_digit],
+                [],
+                [],
+                2
+            ),
+            cache=cache
+        )
+        stats = supervised_learning.fit([DataSample(2, 5), DataSample(3, 6)])
+        assert 'cached' != stats.stop_reason
+
+
+def test_supervised_learning_checkpoint(tmp_path):
+    training_data = [DataSample(2, 5), DataSample(3, 7), DataSample(5, 11)]
+    path = str(tmp_path / 'checkpoint.json')
+    reference = SupervisedLearning(
+        Calculator(),
+        brute_force_generator_max_length=3
+    )
+    reference.fit(training_data)
+
+    interrupted = SupervisedLearning(
+        Calculator(),
+        brute_force_generator_max_length=3,
+        checkpoint_path=path,
+        checkpoint_interval=0
+    )
+    scored = []
+
+    def score(strategy, *args):
+        if len(scored) == 40:
+            raise KeyboardInterrupt
+        scored.append(strategy)
+        return SupervisedLearning._score(interrupted, strategy, *args)
+
+    interrupted._score = score
+    with raises(KeyboardInterrupt):
+        interrupted.fit(training_data)
+    with open(path) as file:
+        position = load(file)['position']
+    assert 40 <= position < reference.strategy_generator.index_of(
+        reference.best_strategy
+    )
+
+    with raises(ValueError):
+        SupervisedLearning(
+            Calculator(),
+            brute_force_generator_max_length=4
+        ).fit(training_data, resume_from=path)
+
+    resumed = SupervisedLearning(
+        Calculator(),
+        brute_force_generator_max_length=3
+    )
+    resumed.fit(training_data, resume_from=path)
+    assert 1 == resumed.best_score
+    assert reference.best_strategy == resumed.best_strategy
+
+
+@mark.parametrize('parallel', [None, 2])
+def test_supervised_learning_budget(parallel):
+    training_data = [DataSample(2, 5), DataSample(3, 7), DataSample(5, 11)]
+    supervised_learning = SupervisedLearning(
+        Calculator(),
+        brute_force_generator_max_length=3,
+        parallel=parallel,
+        parallel_chunk_size=10,
+        max_candidates=250
+    )
+    stats = supervised_learning.fit(training_data)
+    assert 'max_candidates' == stats.stop_reason
+    assert 250 <= stats.candidates < 260
+    assert 2 == stats.completed_length
+    assert stats.candidates == sum(
+        length_stats['candidates'] for length_stats in stats.lengths.values()
+    )
+    assert supervised_learning.best_score == max(
+        length_stats['best_score'] for length_stats in stats.lengths.values()
+    )
+    assert supervised_learning.best_score < 1
+
+    supervised_learning.time_limit = 0
+    stats = supervised_learning.fit(training_data)
+    assert 'time_limit' == stats.stop_reason
+    assert 0 == stats.candidates
+
+
+def test_supervised_learning_stats():
+    training_data = [DataSample(2, 5), DataSample(3, 7), DataSample(5, 11)]
+    supervised_learning = SupervisedLearning(
+        Calculator(),
+        brute_force_generator_max_length=2,
+        accepted_score=2
+    )
+    stats = supervised_learning.fit(training_data)
+    assert 'exhausted' == stats.stop_reason
+    assert 2 == stats.completed_length
+    assert [0, 1, 2] == sorted(stats.lengths)
+
+    memory = supervised_learning.memory
+    supervised_learning.accepted_score = 1
+    supervised_learning.strategy_generator = BruteForceGenerator(
+        memory.actions,
+        memory.control_structures,
+        memory.conditions,
+        3
+    )
+    stats = supervised_learning.fit(training_data)
+    assert 'accepted' == stats.stop_reason
+    assert 2 == stats.completed_length
+    assert 1 == stats.lengths[3]['best_score']
+
+
+@mark.parametrize("parallel", [None, 2])
+def test_supervised_learning_instrumentation(parallel):
+    data = [DataSample(2, 5), DataSample(3, 8), DataSample(5, 14)]
+    supervised_learning = SupervisedLearning(
+        Calculator(),
+        brute_force_generator_max_length=3,
+        accepted_score=2,
+        parallel=parallel,
+        progress_interval=0
+    )
+    improvements = []
+    progress = []
+    supervised_learning.add_event_listener(
+        'new_best',
+        lambda args: improvements.append((args['index'], args['score']))
+    )
+    supervised_learning.add_event_listener(
+        'progress',
+        lambda args: progress.append(args['search_stats'].generated)
+    )
+    stats = supervised_learning.fit(data)
+
+    assert improvements[-1] == (stats.best_index, stats.best_score)
+    assert stats.best_score == supervised_learning.best_score
+    assert progress and progress == sorted(progress)
+    # Every index up to the size was generated, only valid ones were scored
+    assert supervised_learning.strategy_generator.size() == stats.generated
+    assert 0 < stats.rejected < stats.generated
+    assert 3 == len(stats.sample_rejections)
+    assert all(
+        0 < rejections < stats.candidates
+        for rejections in stats.sample_rejections
+    )
+    # Every candidate presses at least one button for every sample
+    assert stats.operations >= 3 * stats.candidates
+    assert stats.candidates_per_second() > 0
+
+
+@mark.parametrize("parallel", [None, 2])
+def test_supervised_learning_seen_size(parallel):
+    data = [DataSample(2, 5), DataSample(3, 7), DataSample(5, 11)]
+    results = []
+    for seen_size in (None, 10 ** 6):
+        calculator = Calculator()
+        calculator.actions = calculator.actions + calculator.actions[:3]
+        supervised_learning = SupervisedLearning(
+            calculator,
+            brute_force_generator_max_length=3,
+            parallel=parallel,
+            seen_size=seen_size
+        )
+        stats = supervised_learning.fit(data)
+        results.append(stats)
+        assert 9 == supervised_learning.predict(4)
+    assert 0 == results[0].duplicates
+    assert 0 == results[0].duplicate_rate()
+    assert results[1].duplicates > 0
+    assert 0 < results[1].duplicate_rate() < 1
+    assert results[1].candidates < results[0].candidates
+    assert results[0].generated == results[1].generated
+
+
+def test_supervised_learning_fit_stream(tmp_path):
+    # 2x + 1, but the first samples also fit shorter strategies
+    data = [DataSample(1, 3), DataSample(2, 5)] + [
+        DataSample(x, 2 * x + 1) for x in range(10, 200)
+    ]
+    supervised_learning = SupervisedLearning(
+        Calculator(),
+        brute_force_generator_max_length=3
+    )
+    expected_stats = supervised_learning.fit(data)
+
+    path = str(tmp_path / 'samples.jsonl')
+    with open(path, 'w') as file:
+        for sample in data:
+            file.write(
+                '{{"input": {}, "output": {}}}\n'.format(
+                    sample.input,
+                    sample.output
+                )
+            )
+    for samples in (data, lambda: DataSample.from_jsonl(path)):
+        supervised_learning = SupervisedLearning(
+            Calculator(),
+            brute_force_generator_max_length=3
+        )
+        stats = supervised_learning.fit_stream(
+            samples,
+            active_size=1,
+            max_active_size=2
+        )
+        assert 'accepted' == stats.stop_reason
+        assert 1 == supervised_learning.best_score
+        assert expected_stats.best_index == stats.best_index
+        assert 0 < stats.counterexamples
+        # Every candidate was scored once
+        assert expected_stats.candidates == stats.candidates
+        assert 2 == len(stats.sample_rejections)
+        assert 9 == supervised_learning.predict(4)
+
+    with raises(ValueError):
+        supervised_learning.fit_stream(iter(data))
+
+    # Samples that can be iterated only once
+    opened = []
+
+    def open_once():
+        opened.append(True)
+        return iter(data if len(opened) == 1 else [])
+
+    with raises(ValueError):
+        supervised_learning.fit_stream(open_once, active_size=1)
+
+
+def test_supervised_learning_prune_redundant():
+    training_data = [
+        DataSample([0, 0, 3, 0], [0, 1, 3, 0]),
+        DataSample([4, 0, 0, 0], [4, 1, 0, 0]),
+        DataSample([3, 2, 0, 1], [3, 1, 0, 1])
+    ]
+    stats = {}
+    for prune_redundant in (False, True):
+        supervised_learning = SupervisedLearning(
+            Tape(4, (4,)),
+            preprocess_input=array,
+            preprocess_output=array,
+            postprocess_output=lambda output: output.tolist(),
+            brute_force_generator_max_length=2,
+            prune_redundant=prune_redundant
+        )
+        stats[prune_redundant] = supervised_learning.fit(training_data)
+        assert 1 == supervised_learning.best_score
+    assert stats[True].candidates < stats[False].candidates
+
+
+@mark.parametrize("tape_class", [Tape, FastTape])
+def test_supervised_learning_predict_like_fit(tape_class):
+    training_data = [
+        DataSample([0, 0, 3, 0], [0, 1, 3, 0]),
+        DataSample([4, 0, 0, 0], [4, 1, 0, 0]),
+        DataSample([3, 2, 0, 1], [3, 1, 0, 1])
+    ]
+    supervised_learning = SupervisedLearning(
+        tape_class(4, (4,)),
+        preprocess_input=array,
+        preprocess_output=array,
+        brute_force_generator_max_length=2
+    )
+    supervised_learning.fit(training_data)
+    assert 1 == supervised_learning.best_score
+    # Predictions don't share the memory's data
+    outputs = [
+        supervised_learning.predict(sample.input) for sample in training_data
+    ]
+    for sample, output in zip(training_data, outputs):
+        assert sample.output == output.tolist()
+
+
+def test_supervised_learning_memory_set_up_before_fit():
+    tape = Tape(3, (3,))
+    supervised_learning = SupervisedLearning(
+        tape,
+        preprocess_input=array,
+        preprocess_output=array,
+        postprocess_output=lambda output: output.tolist(),
+        strategy_generator=BruteForceGenerator([tape.set_selected], [], [], 1)
+    )
+    # The memory can be set up after the supervised learning is created
+    tape.selected_value = 2
+    supervised_learning.fit([DataSample([0, 1, 1], [2, 1, 1])])
+    assert 1 == supervised_learning.best_score
+    assert [2, 0, 0] == supervised_learning.predict([1, 0, 0])
+
+
+def test_supervised_learning_best_first():
+    training_data = [DataSample(x, 3 * x + 12) for x in (2, 3, 5, 7)]
+    stats = {}
+    for generator_class in (BruteForceGenerator, BestFirstGenerator):
+        memory = Calculator()
+        supervised_learning = SupervisedLearning(
+            memory,
+            strategy_generator=generator_class(
+                memory.actions,
+                memory.control_structures,
+                memory.conditions,
+                5
+            )
+        )
+        stats[generator_class] = supervised_learning.fit(training_data)
+        assert 1 == supervised_learning.best_score
+        assert 15 == supervised_learning.predict(1)
+    assert (
+        stats[BestFirstGenerator].candidates <
+        stats[BruteForceGenerator].candidates
+    )
+    assert stats[BestFirstGenerator].completed_length is None
+
+    supervised_learning.parallel = 2
+    with raises(ValueError):
+        supervised_learning.fit(training_data)
+
+
+@mark.parametrize('batched', [False, True])
+def test_supervised_learning_incremental(batched, monkeypatch):
+    training_data = [
+        DataSample([0, 0, 3, 0], [0, 1, 3, 0]),
+        DataSample([4, 0, 0, 0], [4, 1, 0, 0]),
+        DataSample([3, 2, 0, 1], [3, 1, 0, 1])
+    ]
+    scores = {}
+
+    def record(stats, index, score):
+        scores[incremental][index] = score
+
+    monkeypatch.setattr(SearchStats, 'record', record)
+    for incremental in (False, True):
+        scores[incremental] = {}
+        memory = BatchTape(4, (4,)) if batched else Tape(4, (4,))
+        memory.control_structures = (
+            [BatchConditionalStatement, BatchWhileLoop] if batched
+            else [ConditionalStatement, WhileLoop]
+        )
+        supervised_learning = SupervisedLearning(
+            memory,
+            preprocess_input=array,
+            preprocess_output=array,
+            brute_force_generator_max_length=3,
+            max_operations=6,
+            accepted_score=2,
+            incremental=incremental
+        )
+        supervised_learning.fit(training_data)
+    assert scores[False] == scores[True]
+    assert 1 == max(scores[True].values())
+
+
+def test_supervised_learning_incremental_generator():
+    memory = Calculator()
+    supervised_learning = SupervisedLearning(
+        memory,
+        strategy_generator=BestFirstGenerator(
+            memory.actions,
+            memory.control_structures,
+            memory.conditions,
+            3
+        ),
+        incremental=True
+    )
+    # Best-first generators don't enumerate strategies depth-first
+    with raises(ValueError):
+        supervised_learning.fit([DataSample(2, 5)])
+
+
+def test_supervised_learning_batch_tape():
+    training_data = [
+        DataSample([0, 0, 3, 0], [0, 1, 3, 0]),
+        DataSample([4, 0, 0, 0], [4, 1, 0, 0]),
+        DataSample([3, 2, 0, 1], [3, 1, 0, 1])
+    ]
+    memory = BatchTape(4, (4,))
+    memory.control_structures = [BatchConditionalStatement, BatchWhileLoop]
+    supervised_learning = SupervisedLearning(
+        memory,
+        preprocess_input=array,
+        preprocess_output=array,
+        postprocess_output=lambda output: output.tolist(),
+        brute_force_generator_max_length=2
+    )
+    supervised_learning.fit(training_data)
+    assert 1 == supervised_learning.best_score
+    assert [2, 1, 0, 0] == supervised_learning.predict([2, 0, 0, 0])
+
+
+def test_supervised_learning_batch_calculator():
+    data = [DataSample(2, 5), DataSample(3, 7), DataSample(5, 11)]
+    results = []
+    for memory in (Calculator(), BatchCalculator()):
+        supervised_learning = SupervisedLearning(
+            memory,
+            brute_force_generator_max_length=3
+        )
+        stats = supervised_learning.fit(data)
+        results.append((
+            stats.candidates,
+            stats.best_index,
+            stats.operations,
+            list(stats.sample_rejections)
+        ))
+        assert 9 == supervised_learning.predict(4)
+    assert results[0] == results[1]
+
+
 def supervised_learning_2_data():
     test_file_names = ['tests/data/test.json']
     for file_name in test_file_names:
@@ -44,10 +647,11 @@ def supervised_learning_2_data():
         yield (data['train'], data['test'])
 
 
+@mark.parametrize("tape_class", [Tape, FastTape])
 @mark.parametrize("training_data, testing_data", supervised_learning_2_data())
-def test_supervised_learning_2(training_data, testing_data):
-    input_tape = Tape(9, (0,))
-    output_tape = Tape(9, (0,))
+def test_supervised_learning_2(training_data, testing_data, tape_class):
+    input_tape = tape_class(9, (0,))
+    output_tape = tape_class(9, (0,))
     memory = MemoryCollection(
         {
             'input': input_tape,